@@ -1,11 +1,13 @@
 import streamlit as st
 from core.state import init_state
-from core.storage import load_settings, load_events
+from core.storage import load_settings
+from core.bootstrap import run_bootstrap
 from core.auth import ensure_login, get_current_user_role, get_trainer_name, refresh_session_passwords
 from pages.admin import admin_page
 from pages.viewer import viewer_page
 from pages.trainer import trainer_page
 from core.config import EXCEL_FILE
+from core.logging_config import setup_logging
 
 st.set_page_config(page_title="EQS Event Scheduling", layout="wide")
 
@@ -37,7 +39,10 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Load timings and storage messages go to logs/app.log and the console
+setup_logging()
 init_state()
+run_bootstrap()
 
 users_df, trainers_df, lists_df, rules_df, defaults_df, notif_df = load_settings()
 
@@ -59,8 +64,7 @@ with st.sidebar:
         st.session_state.user_email = None
         st.rerun()
 
-# load live data + settings
-df = load_events()
+# settings; each view loads the events it needs (calendars only one month)
 TRAINERS = trainers_df[trainers_df["Active"]==True]["Name"].tolist()
 TRAINER_COLORS = {r["Name"]: r["Color"] for _, r in trainers_df.iterrows() if r["Active"]==True}
 
@@ -104,12 +108,12 @@ if role == "admin":
         RULE_ONLY_ADMIN_CAN_BLOCK, RULE_BLOCK_PREVENT_DUPLICATES,
         users_df, trainers_df, lists_df, rules_df, defaults_df, notif_df, EXCEL_FILE, refresh_pw_cb
     )
-    df = admin_page(df, user_email, settings_tuple)
+    admin_page(user_email, settings_tuple)
 elif role == "view_only":
     # Pass statuses and sources without "All" prefix (the filter adds it)
     viewer_statuses = [s for s in STATUSES if s != "All"]
     viewer_sources = [s for s in SOURCES if s != "All"]
-    df = viewer_page(df, user_email, {
+    viewer_page(user_email, {
         "TRAINERS": TRAINERS,
         "TRAINER_COLORS": TRAINER_COLORS,
         "STATUSES": viewer_statuses,
@@ -123,7 +127,7 @@ elif role == "trainer":
     # Pass statuses and sources without "All" prefix (the filter adds it)
     trainer_statuses = [s for s in STATUSES if s != "All"]
     trainer_sources = [s for s in SOURCES if s != "All"]
-    df = trainer_page(df, user_email, {
+    trainer_page(user_email, {
         "trainer_name": trainer_name,
         "trainer_color": trainer_color,
         "STATUSES": trainer_statuses,
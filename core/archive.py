@@ -0,0 +1,55 @@
+import os
+import pandas as pd
+from .config import ARCHIVE_FILE
+from .columnar import HAVE_ARROW
+from .snapshot import new_snapshot
+
+if HAVE_ARROW:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+# Rows per Parquet row group. Rows are stored in Date order, so a date-range
+# read only decodes the row groups whose Date statistics overlap the range.
+ROW_GROUP_SIZE = 5000
+
+def read_archive(start=None, end=None):
+    """Return archived events with start <= Date < end (either bound optional)."""
+    if not HAVE_ARROW or not os.path.exists(ARCHIVE_FILE):
+        return pd.DataFrame()
+    filters = []
+    if start is not None:
+        filters.append(("Date", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("Date", "<", pd.Timestamp(end)))
+    return pq.read_table(ARCHIVE_FILE, filters=filters or None).to_pandas()
+
+def add_to_archive(df):
+    """Merge events into the archive by Event ID and rewrite it atomically.
+
+    The archive is written zstd-compressed in Date order. A row archived twice
+    (e.g. after an interrupted archive run) keeps its latest copy.
+    """
+    if not HAVE_ARROW:
+        raise RuntimeError("Archiving events needs pyarrow")
+    existing = read_archive()
+    combined = pd.concat([existing, df], ignore_index=True) if len(existing) else df.reset_index(drop=True)
+    combined = combined.drop_duplicates(subset=["Event ID"], keep="last")
+    _write(combined)
+    return len(combined)
+
+def replace_archive(df):
+    """Make df the whole archive (e.g. when restoring a backup). An empty
+    df removes the archive file."""
+    if not len(df):
+        if os.path.exists(ARCHIVE_FILE):
+            os.remove(ARCHIVE_FILE)
+        return
+    if not HAVE_ARROW:
+        raise RuntimeError("Restoring archived events needs pyarrow")
+    _write(df)
+
+def _write(df):
+    df = df.sort_values("Date", kind="stable", na_position="last")
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    with new_snapshot(ARCHIVE_FILE) as tmp:
+        pq.write_table(table, tmp, compression="zstd", row_group_size=ROW_GROUP_SIZE)
@@ -0,0 +1,42 @@
+import os, json
+import pandas as pd
+from .config import AUDIT_LOG_FILE
+from .snapshot import new_snapshot
+
+AUDIT_COLUMNS = ["Timestamp", "User", "Action", "Details"]
+
+def append_entries(entries):
+    """Append audit entries as JSON lines.
+
+    The file is opened in append mode and never rewritten, so the cost of an
+    append does not depend on how much history the log already holds.
+    """
+    if not entries:
+        return
+    data = "".join(json.dumps(e, default=str) + "\n" for e in entries)
+    with open(AUDIT_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+def replace_entries(entries):
+    """Rewrite the whole log atomically. Only used by one-off migrations."""
+    with new_snapshot(AUDIT_LOG_FILE) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e, default=str) + "\n" for e in entries))
+
+def read_entries():
+    """Return the whole audit log as a DataFrame, oldest first."""
+    if not os.path.exists(AUDIT_LOG_FILE):
+        return pd.DataFrame(columns=AUDIT_COLUMNS)
+    rows = []
+    with open(AUDIT_LOG_FILE, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                # A torn last line from a crash mid-write; skip it
+                continue
+    return pd.DataFrame(rows, columns=AUDIT_COLUMNS)
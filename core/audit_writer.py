@@ -0,0 +1,120 @@
+import atexit, logging, queue, threading, time
+
+class AuditWriter:
+    """Background writer that takes audit I/O off the Streamlit script thread.
+
+    submit() only enqueues. A daemon thread drains the bounded queue and hands
+    entries to sink(list_of_entries) in batches, either when batch_size entries
+    are waiting or flush_interval seconds after the first one arrived. If the
+    queue is full the entry is written synchronously instead of being dropped.
+    Everything still queued is flushed at interpreter exit.
+    """
+
+    def __init__(self, sink, max_queue=10000, batch_size=200, flush_interval=1.0):
+        self._sink = sink
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._flush_now = threading.Event()
+        self.entries_written = 0
+        self.batches_written = 0
+        self.sync_fallbacks = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, entry):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.sync_fallbacks += 1
+            self._write([entry])
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        with self._write_lock:
+            try:
+                self._sink(batch)
+            except Exception:
+                logging.exception(f"Failed to write {len(batch)} audit entries")
+                return
+            elapsed = (time.perf_counter() - started) * 1000
+            self.entries_written += len(batch)
+            self.batches_written += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+
+    def _drain(self, first=None, deadline=None):
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            if deadline is None or self._flush_now.is_set() or time.monotonic() >= deadline:
+                break
+            time.sleep(0.02)
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = self._drain(first, time.monotonic() + self.flush_interval)
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every entry submitted so far has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._flush_now.set()
+            try:
+                self._queue.join()
+            finally:
+                self._flush_now.clear()
+            return
+        self._flush_remaining()
+
+    def _flush_remaining(self):
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def close(self):
+        """Stop the writer thread and write whatever is still queued."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._flush_remaining()
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "entries_written": self.entries_written,
+            "batches_written": self.batches_written,
+            "sync_fallbacks": self.sync_fallbacks,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+            "max_flush_ms": round(self.max_flush_ms, 1),
+        }
@@ -0,0 +1,339 @@
+import os, json, gzip, hashlib, logging, threading
+from datetime import datetime, date, time, timedelta
+from openpyxl import Workbook, load_workbook
+from .locks import FileLock
+from .snapshot import new_snapshot
+
+# A backup is a small JSON manifest listing, per sheet, the content hashes of
+# its chunks. Chunks are gzip-compressed JSON row lists stored once under
+# objects/ by their hash, so a backup only adds the chunks that changed since
+# any earlier one. Events rows are chunked by run of calendar month (the sheet
+# is kept in Date order), so editing one event rewrites one month's chunk;
+# other sheets are one chunk each. The events archive, when given, is stored
+# the same way as the Events sheet under the manifest's "archive" key. Every
+# manifest names all of its chunks, so any backup is restored directly
+# without replaying the ones before it.
+
+MANIFEST_SUFFIX = ".json"
+LEGACY_SUFFIX = ".xlsx"
+OBJECTS_DIR = "objects"
+# Name, time, size and checksum of every backup, so listing them reads one
+# small file instead of opening each manifest
+CATALOG_FILE = "catalog.json"
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, time):
+        return {"$t": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {"$td": value.total_seconds()}
+    return str(value)
+
+def _decode(obj):
+    if "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    if "$d" in obj:
+        return date.fromisoformat(obj["$d"])
+    if "$t" in obj:
+        return time.fromisoformat(obj["$t"])
+    if "$td" in obj:
+        return timedelta(seconds=obj["$td"])
+    return obj
+
+def _month_of(row, date_col):
+    value = row[date_col] if date_col is not None and date_col < len(row) else None
+    return (value.year, value.month) if isinstance(value, (datetime, date)) else None
+
+def _chunks(rows, by_month):
+    """Split a sheet's rows (header first) into content chunks."""
+    if not by_month or not rows:
+        return [rows]
+    header, body = rows[0], rows[1:]
+    date_col = header.index("Date") if "Date" in header else None
+    chunks, current, current_month = [[header]], [], object()
+    for row in body:
+        month = _month_of(row, date_col)
+        if current and month != current_month:
+            chunks.append(current)
+            current = []
+        current.append(row)
+        current_month = month
+    if current:
+        chunks.append(current)
+    return chunks
+
+class BackupStore:
+    """Content-addressed, deduplicated backups of the workbook in one folder."""
+
+    def __init__(self, directory, prefix):
+        self.directory = directory
+        self.prefix = prefix
+        self.objects = os.path.join(directory, OBJECTS_DIR)
+        # Held by every change to the folder, so a prune never deletes chunks
+        # a backup is still writing its manifest for and catalog updates
+        # never interleave
+        self.lock = FileLock(os.path.join(directory, ".backups"))
+        self.catalog_path = os.path.join(directory, CATALOG_FILE)
+        self._catalog = None
+        self._catalog_signature = None
+        self._prune_thread = None
+        self._prune_start = threading.Lock()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest + ".json.gz")
+
+    def _put(self, rows):
+        """Store rows as a chunk; returns (hash, bytes written, stored size)."""
+        data = json.dumps(rows, default=_encode, separators=(",", ":")).encode()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0, os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with new_snapshot(path) as tmp, open(tmp, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6, mtime=0))
+        size = os.path.getsize(path)
+        return digest, size, size
+
+    def _get(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(gzip.decompress(f.read()), object_hook=_decode)
+
+    def manifest_path(self, name):
+        return os.path.join(self.directory, name)
+
+    def is_manifest(self, name):
+        return name.startswith(self.prefix) and name.endswith(MANIFEST_SUFFIX)
+
+    def is_legacy(self, name):
+        """Whole-workbook copies made before backups were deduplicated."""
+        return name.startswith(self.prefix) and name.endswith(LEGACY_SUFFIX)
+
+    def _manifest_entry(self, name, manifest, data):
+        return {
+            "filename": name,
+            "created": manifest["created"],
+            "size": manifest.get("stored_bytes", 0),
+            "added": manifest.get("added_bytes", 0),
+            "checksum": hashlib.sha256(data).hexdigest(),
+        }
+
+    def _legacy_entry(self, name):
+        path = self.manifest_path(name)
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        size = os.path.getsize(path)
+        return {
+            "filename": name,
+            "created": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds"),
+            "size": size,
+            "added": size,
+            "checksum": digest.hexdigest(),
+        }
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            try:
+                if self.is_manifest(name):
+                    with open(self.manifest_path(name), "rb") as f:
+                        data = f.read()
+                    entries.append(self._manifest_entry(name, json.loads(data), data))
+                elif self.is_legacy(name):
+                    entries.append(self._legacy_entry(name))
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Skipping unreadable backup {name}: {e}")
+        return entries
+
+    def _save_catalog(self, entries):
+        entries = sorted(entries, key=lambda e: e["created"], reverse=True)
+        with new_snapshot(self.catalog_path) as tmp, open(tmp, "w") as f:
+            json.dump(entries, f)
+        self._catalog, self._catalog_signature = entries, None
+
+    def _update_catalog(self, add=None, remove=()):
+        # Callers hold self.lock exclusively
+        entries = [e for e in self.catalog() if e["filename"] not in remove]
+        if add is not None:
+            entries = [e for e in entries if e["filename"] != add["filename"]] + [add]
+        self._save_catalog(entries)
+
+    def catalog(self):
+        """Return the catalog entries, newest first.
+
+        Each entry has filename, created (ISO time), size and added (bytes)
+        and checksum (sha256 of the manifest or legacy file). The file is
+        reread only when it changes, and rebuilt by scanning the folder if
+        it is missing.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        try:
+            st = os.stat(self.catalog_path)
+        except FileNotFoundError:
+            with self.lock.exclusive():
+                if not os.path.exists(self.catalog_path):
+                    self._save_catalog(self._scan())
+            st = os.stat(self.catalog_path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if self._catalog is None or signature != self._catalog_signature:
+            with open(self.catalog_path) as f:
+                self._catalog = json.load(f)
+            self._catalog_signature = signature
+        return self._catalog
+
+    def _put_chunks(self, rows, by_month):
+        """Store rows as chunks; returns (hashes, bytes written, stored size)."""
+        digests, added, total = [], 0, 0
+        for chunk in _chunks(rows, by_month):
+            digest, written, size = self._put(chunk)
+            digests.append(digest)
+            added += written
+            total += size
+        return digests, added, total
+
+    def create(self, source, events_sheet, stamp=None, archive_rows=None):
+        """Back up the workbook at source (path or file-like) and, if given,
+        the archived events as rows (header first); returns the manifest name."""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = stamp or datetime.now()
+        name = f"{self.prefix}{stamp.strftime('%Y%m%d_%H%M%S')}{MANIFEST_SUFFIX}"
+        wb = load_workbook(source, read_only=True, data_only=True)
+        try:
+            with self.lock.exclusive():
+                sheets, added, total = [], 0, 0
+                for ws in wb.worksheets:
+                    rows = [list(row) for row in ws.iter_rows(values_only=True)]
+                    digests, written, size = self._put_chunks(rows, ws.title == events_sheet)
+                    sheets.append({"name": ws.title, "chunks": digests})
+                    added += written
+                    total += size
+                manifest = {
+                    "created": stamp.isoformat(timespec="seconds"),
+                    "sheets": sheets,
+                }
+                if archive_rows is not None:
+                    digests, written, size = self._put_chunks(archive_rows, True)
+                    manifest["archive"] = digests
+                    added += written
+                    total += size
+                manifest["stored_bytes"] = total
+                manifest["added_bytes"] = added
+                data = json.dumps(manifest).encode()
+                with new_snapshot(self.manifest_path(name)) as tmp, open(tmp, "wb") as f:
+                    f.write(data)
+                self._update_catalog(add=self._manifest_entry(name, manifest, data))
+        finally:
+            wb.close()
+        return name
+
+    def read_manifest(self, name):
+        with open(self.manifest_path(name)) as f:
+            return json.load(f)
+
+    def manifests(self):
+        """Return [(name, manifest)] newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in os.listdir(self.directory):
+            if self.is_manifest(name):
+                try:
+                    found.append((name, self.read_manifest(name)))
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Skipping unreadable backup manifest {name}: {e}")
+        found.sort(key=lambda item: item[1].get("created", ""), reverse=True)
+        return found
+
+    def build(self, name, target):
+        """Write the workbook recorded by manifest name to target (path or file-like)."""
+        manifest = self.read_manifest(name)
+        wb = Workbook(write_only=True)
+        for sheet in manifest["sheets"]:
+            ws = wb.create_sheet(sheet["name"])
+            for digest in sheet["chunks"]:
+                for row in self._get(digest):
+                    ws.append(row)
+        wb.save(target)
+
+    def archive_rows(self, name):
+        """The archived events recorded by manifest name as rows (header
+        first; [] if there was no archive), or None for backups made
+        before the archive was backed up."""
+        digests = self.read_manifest(name).get("archive")
+        if digests is None:
+            return None
+        return [row for digest in digests for row in self._get(digest)]
+
+    def delete(self, name):
+        """Remove a backup. A manifest's chunks go at the next prune if nothing
+        else uses them."""
+        path = self.manifest_path(name)
+        if not os.path.exists(path):
+            return False
+        with self.lock.exclusive():
+            os.remove(path)
+            self._update_catalog(remove={name})
+        return True
+
+    def prune(self, keep_last, keep_daily_days, keep_weekly_weeks, now=None):
+        """Apply the retention policy, then delete chunks no manifest references.
+
+        Kept: the keep_last newest backups, the newest backup of each day for
+        keep_daily_days days and of each ISO week for keep_weekly_weeks weeks.
+        Returns (manifests removed, chunks removed).
+        """
+        if not os.path.isdir(self.directory):
+            return 0, 0
+        now = now or datetime.now()
+        with self.lock.exclusive():
+            manifests = self.manifests()
+            keep, days, weeks = set(), set(), set()
+            for i, (name, manifest) in enumerate(manifests):
+                created = datetime.fromisoformat(manifest["created"])
+                day, week = created.date(), created.isocalendar()[:2]
+                if i < keep_last:
+                    keep.add(name)
+                elif created >= now - timedelta(days=keep_daily_days) and day not in days:
+                    keep.add(name)
+                elif created >= now - timedelta(weeks=keep_weekly_weeks) and week not in weeks:
+                    keep.add(name)
+                days.add(day)
+                weeks.add(week)
+            removed = set()
+            for name, _ in manifests:
+                if name not in keep:
+                    os.remove(self.manifest_path(name))
+                    removed.add(name)
+            if removed:
+                self._update_catalog(remove=removed)
+            used = {d for name, m in manifests if name in keep for s in m["sheets"] for d in s["chunks"]}
+            used.update(d for name, m in manifests if name in keep for d in m.get("archive", ()))
+            swept = 0
+            if os.path.isdir(self.objects):
+                for root, _, files in os.walk(self.objects):
+                    for filename in files:
+                        if filename.endswith(".json.gz") and filename[:-len(".json.gz")] not in used:
+                            os.remove(os.path.join(root, filename))
+                            swept += 1
+        return len(removed), swept
+
+    def prune_in_background(self, *args):
+        """Run prune(*args) on a daemon thread unless one is already running."""
+        with self._prune_start:
+            if self._prune_thread is not None and self._prune_thread.is_alive():
+                return
+            def run():
+                try:
+                    removed, swept = self.prune(*args)
+                    if removed or swept:
+                        logging.info(f"Pruned {removed} backups and {swept} unused chunks")
+                except Exception:
+                    logging.exception("Backup pruning failed")
+            self._prune_thread = threading.Thread(target=run, name="backup-prune", daemon=True)
+            self._prune_thread.start()
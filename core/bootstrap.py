@@ -0,0 +1,55 @@
+import threading, logging
+from .storage import read_meta, write_meta, seed_defaults_if_empty, assign_event_ids, migrate_audit_sheet, workbook_lock
+
+# Schema migrations as (version, step). A step runs once, when the workbook's
+# recorded schema_version is below its number. Append new steps with the next
+# version number; never renumber or remove existing ones.
+MIGRATIONS = [
+    (1, seed_defaults_if_empty),
+    (2, assign_event_ids),
+    (3, migrate_audit_sheet),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Seconds a process waits for another one to finish migrating the workbook
+MIGRATION_LOCK_TIMEOUT = 600
+
+_lock = threading.Lock()
+_bootstrapped = False
+
+def get_schema_version():
+    try:
+        return int(read_meta().get("schema_version", 0))
+    except (TypeError, ValueError):
+        return 0
+
+def run_bootstrap():
+    """Bring the workbook up to SCHEMA_VERSION once per process.
+
+    Seeding, password migration and the dev account check used to run on every
+    rerun. They now run only when the workbook is behind, and the applied
+    version is recorded in the Meta sheet so later processes skip them too.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    with _lock:
+        if _bootstrapped:
+            return
+        if get_schema_version() < SCHEMA_VERSION:
+            # Another process may be starting on the same old workbook: only
+            # one runs the steps, and the others see its version once it is done
+            with workbook_lock.exclusive(timeout=MIGRATION_LOCK_TIMEOUT):
+                current = get_schema_version()
+                for version, step in MIGRATIONS:
+                    if version > current:
+                        logging.info(f"Applying schema migration {version}: {step.__name__}")
+                        step()
+                        write_meta(schema_version=version)
+        _bootstrapped = True
+
+def reset_bootstrap():
+    """Force the next run_bootstrap() to re-check the workbook's schema version."""
+    global _bootstrapped
+    with _lock:
+        _bootstrapped = False
@@ -0,0 +1,163 @@
+import os, json, hashlib, logging
+from .snapshot import new_snapshot
+
+# pyarrow is optional: without it no snapshot is published and every cold
+# load parses the workbook.
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    HAVE_ARROW = True
+except ImportError:
+    pa = ipc = None
+    HAVE_ARROW = False
+
+SOURCE_KEY = b"eqs_source"
+EXTRA_KEY = b"eqs_extra"
+PARTITIONS_KEY = b"eqs_partitions"
+
+def source_key(st, data):
+    """Snapshot key for a source file: its os.stat() result and its bytes."""
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+def file_key(path):
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        return source_key(st, f.read())
+
+def _matches(key, source_path):
+    st = os.stat(source_path)
+    if key["size"] != st.st_size:
+        return False
+    if key["mtime_ns"] == st.st_mtime_ns:
+        return True
+    # Same size, new mtime: a touch or a copy of identical bytes keeps the snapshot
+    with open(source_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest() == key["sha256"]
+
+def _open(path, partition=None):
+    """Map path and return (table, key, extra, partitions) without copying
+    the data. With partition, only that partition's record batches are read."""
+    with pa.memory_map(path, "r") as source:
+        reader = ipc.open_file(source)
+        metadata = reader.schema.metadata or {}
+        partitions = json.loads(metadata.get(PARTITIONS_KEY, b"{}"))
+        if partition is None:
+            table = reader.read_all()
+        else:
+            start, stop = partitions.get(partition, (0, 0))
+            table = pa.Table.from_batches(
+                [reader.get_batch(i) for i in range(start, stop)], schema=reader.schema
+            )
+    # The table's buffers keep the mapping alive after the handle is closed
+    key = json.loads(metadata[SOURCE_KEY]) if SOURCE_KEY in metadata else None
+    return table, key, json.loads(metadata.get(EXTRA_KEY, b"{}")), partitions
+
+def read_snapshot(path, source_path):
+    """Return (df, extra) from the Arrow snapshot if it was published for the
+    current contents of source_path, else None.
+
+    The file is memory-mapped, so every process reading the same snapshot
+    shares one copy of its pages. String columns stay backed by the mapping;
+    only the small fixed-width columns are copied into the DataFrame.
+    """
+    return read_partition(path, source_path, None)
+
+def read_partition(path, source_path, partition):
+    """Like read_snapshot, but read only the rows published under partition
+    (see publish). A partition with no rows gives an empty frame."""
+    if not HAVE_ARROW or not os.path.exists(path):
+        return None
+    try:
+        table, key, extra, _ = _open(path, partition)
+        if key is None or not _matches(key, source_path):
+            return None
+        return table.to_pandas(), extra
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+
+def _to_table(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # All-empty columns have no Arrow type; store them as text
+    schema = pa.schema([
+        pa.field(f.name, pa.string() if pa.types.is_null(f.type) else f.type)
+        for f in table.schema
+    ])
+    return table.cast(schema)
+
+def _write(path, table, key, extra, partitions=None):
+    """Write table as an IPC file. partitions ({name: (start_row, stop_row)},
+    contiguous ranges) are written as separate record batches so that one
+    partition can be read without touching the others."""
+    batches, index = [], {}
+    ranges = sorted((partitions or {}).items(), key=lambda item: item[1][0])
+    for name, (start, stop) in ranges:
+        first = len(batches)
+        batches.extend(table.slice(start, stop - start).to_batches())
+        index[name] = (first, len(batches))
+    if not ranges:
+        batches = table.to_batches()
+    # Drop the pandas metadata: readers infer dtypes from the Arrow types, the
+    # same way they come back from a workbook parse
+    schema = table.schema.with_metadata({
+        SOURCE_KEY: json.dumps(key).encode(),
+        EXTRA_KEY: json.dumps(extra or {}, default=str).encode(),
+        PARTITIONS_KEY: json.dumps(index).encode(),
+    })
+    with new_snapshot(path) as tmp:
+        with pa.OSFile(tmp, "wb") as sink, ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(pa.RecordBatch.from_arrays(batch.columns, schema=schema))
+
+def publish(path, df, key, extra=None, partitions=None):
+    """Atomically publish df as the Arrow snapshot for the source with key.
+
+    extra is a JSON-serialisable dict stored alongside. partitions maps a
+    name to a contiguous (start, stop) range of df's rows. Frames Arrow cannot
+    represent (mixed-type columns) are skipped and the stale snapshot is
+    removed: the snapshot only saves time, it is never the source of truth.
+    """
+    if not HAVE_ARROW:
+        return False
+    try:
+        _write(path, _to_table(df), key, extra, partitions)
+        return True
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OSError) as e:
+        logging.info(f"Not publishing snapshot {path}: {e}")
+        discard(path)
+        return False
+
+def carry_forward(path, old_st, key, extra=None):
+    """Re-stamp the snapshot for a source rewritten without changing its data.
+
+    Only done if the snapshot belonged to the source as it was before the
+    write (old_st, an os.stat() result). extra replaces the stored extra when
+    given. Returns True if the snapshot is valid for key afterwards.
+    """
+    if not HAVE_ARROW or old_st is None or not os.path.exists(path):
+        return False
+    try:
+        table, old_key, old_extra, batch_index = _open(path)
+        if old_key is None or (old_key["mtime_ns"], old_key["size"]) != (old_st.st_mtime_ns, old_st.st_size):
+            return False
+        # Turn the stored batch ranges back into row ranges
+        offsets = [0]
+        for batch in table.to_batches():
+            offsets.append(offsets[-1] + batch.num_rows)
+        partitions = {name: (offsets[a], offsets[b]) for name, (a, b) in batch_index.items()}
+        _write(path, table, key, old_extra if extra is None else extra, partitions)
+        return True
+    except Exception as e:
+        logging.info(f"Not carrying snapshot {path} forward: {e}")
+        discard(path)
+        return False
+
+def discard(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
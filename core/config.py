@@ -1,10 +1,47 @@
+import os
+
 EXCEL_FILE = "scheduling_recent.xlsx"
 EVENTS_SHEET = "Events"
+META_SHEET = "Meta"
 
 # sheet names for settings
 SHEETS = [
     "Users", "Trainers", "Lists", "Rules", "Defaults",
-    "Notifications", "Audit"
+    "Notifications", "Audit", "Meta"
 ]
 
+# Storage engine: "sqlite" keeps everything in SQLITE_FILE, "excel" in EXCEL_FILE.
+# The first SQLite start imports EXCEL_FILE if the database does not exist yet.
+# SQLite writes only the rows a save changes; an xlsx file cannot be written
+# in part, so on "excel" every save rewrites the workbook and its cost grows
+# with the number of events.
+STORAGE_BACKEND = os.environ.get("EQS_STORAGE_BACKEND", "sqlite").lower()
+SQLITE_FILE = os.environ.get("EQS_SQLITE_FILE", "scheduling.db")
+
+# Seconds a storage read or write waits for the workbook lock before failing
+LOCK_TIMEOUT = float(os.environ.get("EQS_LOCK_TIMEOUT", "15"))
+
+# Memory-mapped Arrow copy of the Events sheet (needs pyarrow), published with
+# every committed write and rebuilt when the workbook is changed outside the app
+EVENTS_SNAPSHOT_FILE = os.path.splitext(EXCEL_FILE)[0] + ".events.arrow"
+
+# Events dated before the archive cutoff (today minus ARCHIVE_AFTER_DAYS, or
+# a date picked in Settings) can be moved to a compressed Parquet archive
+ARCHIVE_FILE = os.path.splitext(EXCEL_FILE)[0] + "_archive.parquet"
+ARCHIVE_AFTER_DAYS = int(os.environ.get("EQS_ARCHIVE_AFTER_DAYS", "365"))
+
+# Backup retention, applied after each backup: the newest BACKUP_KEEP_LAST
+# backups, then one per day and one per week for the given spans
+BACKUP_KEEP_LAST = int(os.environ.get("EQS_BACKUP_KEEP_LAST", "10"))
+BACKUP_KEEP_DAILY_DAYS = int(os.environ.get("EQS_BACKUP_KEEP_DAILY_DAYS", "30"))
+BACKUP_KEEP_WEEKLY_WEEKS = int(os.environ.get("EQS_BACKUP_KEEP_WEEKLY_WEEKS", "26"))
+
+# Journal of every event change, for undo and point-in-time restore.
+# Compaction drops entries older than JOURNAL_KEEP_DAYS.
+JOURNAL_FILE = os.path.splitext(EXCEL_FILE)[0] + "_journal.jsonl"
+JOURNAL_KEEP_DAYS = int(os.environ.get("EQS_JOURNAL_KEEP_DAYS", "30"))
+
+# Append-only audit log kept next to the workbook (Excel backend)
+AUDIT_LOG_FILE = os.path.splitext(EXCEL_FILE)[0] + "_audit.jsonl"
+
 LIST_CATEGORIES = ["Locations", "Sources", "Statuses", "Mediums", "Types"]
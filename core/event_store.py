@@ -0,0 +1,139 @@
+import os, threading
+import pandas as pd
+from .config import EXCEL_FILE, SQLITE_FILE, STORAGE_BACKEND, ARCHIVE_FILE
+
+# Sessions share one parsed frame and receive shallow copies of it. With
+# copy-on-write a session editing its copy never touches the shared data.
+# pandas >= 3 always behaves this way and deprecates the option.
+try:
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+except Exception:
+    pass
+
+def file_signature(path):
+    """Return (mtime_ns, size) for path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class EventStore:
+    """One parsed copy of the Events sheet shared by every session in the process.
+
+    The copy is reparsed only after invalidate() (called by the storage write
+    paths) or when the file's mtime/size no longer match what was loaded, which
+    also catches edits made outside the app.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._df = None
+        self._signature = None
+        self._parts = {}
+        self._parts_signature = None
+        self._derived = {}
+        self.loads = 0
+
+    def view(self, loader):
+        """Return a cheap read-only view of the events, loading them if stale.
+
+        The loader runs outside the store's lock: it takes the storage lock,
+        and writers already holding that lock call into the store.
+        """
+        signature = file_signature(self.path)
+        with self._lock:
+            if self._df is not None and signature == self._signature:
+                return self._df.copy(deep=False)
+        df = loader()
+        with self._lock:
+            self._df = df
+            self._signature = signature
+            self._derived = {}
+            self.loads += 1
+        return df.copy(deep=False)
+
+    def derived(self, name, loader, build):
+        """Return build(frame) for the current events frame (loaded with
+        loader if stale): a lookup structure every session shares until the
+        events change.
+        """
+        df = self.view(loader)
+        version = df.attrs.get("version")
+        with self._lock:
+            hit = self._derived.get(name)
+            if hit is not None and hit[0] == version:
+                return hit[1]
+        value = build(df)
+        with self._lock:
+            if self._df is not None and self._df.attrs.get("version") == version:
+                self._derived[name] = (version, value)
+        return value
+
+    def kept(self, name, version):
+        """Return the structure kept under name if it was built for version,
+        else None. Never loads or builds anything."""
+        with self._lock:
+            hit = self._derived.get(name)
+        return hit[1] if hit is not None and hit[0] == version else None
+
+    def advance(self, name, from_version, to_version, update):
+        """After a write from from_version to to_version, replace a kept
+        structure with update(structure) instead of rebuilding it later.
+        update may return None to drop it; it is then rebuilt on next use."""
+        with self._lock:
+            hit = self._derived.pop(name, None)
+        if hit is None or hit[0] != from_version:
+            return
+        value = update(hit[1])
+        if value is None:
+            return
+        with self._lock:
+            self._derived[name] = (to_version, value)
+
+    def view_part(self, key, loader, from_full):
+        """Return a view of one part of the events (e.g. a month).
+
+        If the full frame is loaded and current, from_full(frame) cuts the
+        part out of it. Otherwise loader() reads only that part, and the
+        result is kept until the file changes.
+        """
+        signature = file_signature(self.path)
+        with self._lock:
+            if self._df is not None and signature == self._signature:
+                return from_full(self._df).copy(deep=False)
+            if signature == self._parts_signature and key in self._parts:
+                return self._parts[key].copy(deep=False)
+        part = loader()
+        with self._lock:
+            if signature != self._parts_signature:
+                self._parts = {}
+                self._parts_signature = signature
+            self._parts[key] = part
+        return part.copy(deep=False)
+
+    def replace(self, df):
+        """Install df as the current frame after this process wrote it to disk.
+
+        Callers hold the storage write lock, so the file signature taken here
+        belongs to the write that produced df and no reparse is needed.
+        """
+        with self._lock:
+            self._df = df
+            self._signature = file_signature(self.path)
+            self._parts = {}
+
+    def invalidate(self):
+        """Drop the current frame."""
+        with self._lock:
+            self._df = None
+            self._signature = None
+            self._parts = {}
+            self._parts_signature = None
+            self._derived = {}
+
+event_store = EventStore(SQLITE_FILE if STORAGE_BACKEND == "sqlite" else EXCEL_FILE)
+# Date ranges read from the archive, kept until the archive file changes
+archive_store = EventStore(ARCHIVE_FILE)
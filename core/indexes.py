@@ -0,0 +1,423 @@
+import bisect
+import numpy as np
+from collections import Counter
+import pandas as pd
+
+# Lookup structures derived from an events frame. The event store keeps one
+# of each per events version (see EventStore.derived); after a write,
+# storage advances them by the changed rows instead of rebuilding them.
+
+def _marked_for(value):
+    """"All", or the list of trainers a mark's "Marked For" names."""
+    if pd.isna(value):
+        return []
+    value = str(value).strip()
+    if value.lower() == "all":
+        return "All"
+    return [p.strip() for p in value.split(",") if p.strip()]
+
+class BlockIndex:
+    """The (day, trainer) pairs blocked by marked events.
+
+    "Marked For" is expanded once: an "All" mark blocks its day for every
+    trainer, a comma list blocks each named trainer. Counts are kept so that
+    removing one of two marks on the same day leaves the day blocked.
+    """
+
+    def __init__(self):
+        self.all_days = Counter()
+        self.pairs = Counter()
+        self._days = None
+
+    @classmethod
+    def from_frame(cls, df0):
+        index = cls()
+        index._add(df0, 1)
+        return index
+
+    def _add(self, df0, sign):
+        marks = df0[df0["Is Marked"]]
+        for day, marked_for in zip(marks["Day"], marks["Marked For"]):
+            if pd.isna(day):
+                continue
+            who = _marked_for(marked_for)
+            if who == "All":
+                self.all_days[day] += sign
+            else:
+                for trainer in who:
+                    self.pairs[(day, trainer)] += sign
+        self.all_days = +self.all_days
+        self.pairs = +self.pairs
+        self._days = None
+
+    def updated(self, removed, added):
+        """A new index with the rows of removed taken out and added put in.
+        The index is shared between sessions, so it is never changed in place."""
+        index = BlockIndex()
+        index.all_days = self.all_days.copy()
+        index.pairs = self.pairs.copy()
+        index._add(removed, -1)
+        index._add(added, 1)
+        return index
+
+    def blocked(self, trainers, start, end):
+        """Sorted (day, trainer) pairs blocked for any of trainers from start
+        to end (inclusive). Costs one search plus the blocked days in range."""
+        if self._days is None:
+            self._days = sorted(set(self.all_days) | {day for day, _ in self.pairs})
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        found = []
+        for day in self._days[bisect.bisect_left(self._days, start):bisect.bisect_right(self._days, end)]:
+            for trainer in trainers:
+                if self.all_days[day] > 0 or self.pairs[(day, trainer)] > 0:
+                    found.append((day, trainer))
+        return found
+
+def _trainer_names(value):
+    if pd.isna(value):
+        return []
+    return [p.strip() for p in str(value).split(",") if p.strip()]
+
+def lists_trainer(values, trainer):
+    """Boolean array: which "Trainer Calendar" values name trainer (a scan)."""
+    return values.astype(object).map(lambda value: trainer in _trainer_names(value)).to_numpy(dtype=bool)
+
+def _positions(ids, version, frame):
+    """Positions in ids (the row order of the frame stamped version) of
+    frame's rows, -1 for rows it does not hold. A frame cut from another
+    version maps to nothing."""
+    if frame.attrs.get("version") != version:
+        return np.full(len(frame), -1)
+    return ids.get_indexer(frame.index)
+
+class TrainerIndex:
+    """Row flags per trainer named in "Trainer Calendar", over the row
+    positions of one events frame.
+
+    The comma lists are split once. Filtering a frame cut from the same
+    version (the full frame, a month, a filtered list) maps its Event IDs to
+    positions and reads the flags, so the cost follows the frame, not the
+    history. Other rows (e.g. archived events) are matched by their text.
+    """
+
+    def __init__(self, version, ids):
+        self.version = version
+        self.ids = ids
+        self.flags = {}
+
+    @classmethod
+    def from_frame(cls, df0):
+        index = cls(df0.attrs.get("version"), df0.index)
+        # Few distinct lists recur across many rows: split each list once
+        codes, values = pd.factorize(df0["Trainer Calendar"].astype(object))
+        listing = {}
+        for code, value in enumerate(values):
+            for name in _trainer_names(value):
+                listing.setdefault(name, []).append(code)
+        for name, value_codes in listing.items():
+            index.flags[name] = np.isin(codes, value_codes)
+        return index
+
+    def updated(self, current, updated, changed, version):
+        """The index for updated, written from current (this index's frame)
+        by changing the Event IDs in changed, or None when rows were added,
+        removed or reordered: positions moved, so the index is rebuilt on
+        next use instead. Only the flags of the trainers involved are copied."""
+        if not updated.index.equals(current.index):
+            return None
+        index = TrainerIndex(version, updated.index)
+        index.flags = dict(self.flags)
+        copied = set()
+        def flags(name):
+            if name not in copied:
+                index.flags[name] = index.flags[name].copy() if name in index.flags \
+                    else np.zeros(len(updated), dtype=bool)
+                copied.add(name)
+            return index.flags[name]
+        for position in current.index.get_indexer(list(changed)):
+            if position < 0:
+                continue
+            for name in _trainer_names(current["Trainer Calendar"].iat[position]):
+                if name in index.flags:
+                    flags(name)[position] = False
+            for name in _trainer_names(updated["Trainer Calendar"].iat[position]):
+                flags(name)[position] = True
+        return index
+
+    def mask(self, frame, trainer):
+        """Boolean array: which rows of frame list trainer."""
+        positions = _positions(self.ids, self.version, frame)
+        known = positions >= 0
+        hit = np.zeros(len(frame), dtype=bool)
+        flags = self.flags.get(trainer)
+        if flags is not None:
+            hit[known] = flags[positions[known]]
+        if not known.all():
+            hit[~known] = lists_trainer(frame["Trainer Calendar"][~known], trainer)
+        return hit
+
+class BitmapIndex:
+    """One bitmap per value of each filter column and per trainer, over the
+    row positions of one events frame (packed 8 rows per byte).
+
+    A combination of filters is resolved by ANDing bitmaps; only the
+    positions that survive are turned into rows. Bitmaps belong to one
+    frame: version and length are checked before use.
+    """
+
+    def __init__(self, version, size):
+        self.version = version
+        self.size = size
+        self.bitmaps = {}
+        self.trainers = {}
+
+    @staticmethod
+    def _pack(flags):
+        return np.packbits(np.asarray(flags, dtype=bool))
+
+    @classmethod
+    def from_frame(cls, df0, columns):
+        index = cls(df0.attrs.get("version"), len(df0))
+        for col in columns:
+            values = df0[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes = values.cat.codes.to_numpy()
+                index.bitmaps[col] = {
+                    value: cls._pack(codes == code) for code, value in enumerate(values.cat.categories)
+                }
+            else:
+                index.bitmaps[col] = {
+                    value: cls._pack(values.to_numpy() == value) for value in values.dropna().unique()
+                }
+        names = df0["Trainer Calendar"].reset_index(drop=True).map(_trainer_names).explode().dropna()
+        for name, positions in names.index.groupby(names.to_numpy()).items():
+            flags = np.zeros(len(df0), dtype=bool)
+            flags[np.asarray(positions, dtype=int)] = True
+            index.trainers[name] = cls._pack(flags)
+        return index
+
+    def _flip(self, bitmap, position, on):
+        byte, bit = position >> 3, 0x80 >> (position & 7)
+        if on:
+            bitmap[byte] |= bit
+        else:
+            bitmap[byte] &= ~bit & 0xFF
+
+    def updated(self, current, updated, changed, version):
+        """The index for updated, written from current (this index's frame)
+        by changing the Event IDs in changed.
+
+        When the write only changed values (same rows, same order) just the
+        bits of the changed rows are flipped, copying only the bitmaps they
+        touch. Inserts, deletes and reorders move row positions, so then
+        None is returned and the index is rebuilt on next use.
+        """
+        if not updated.index.equals(current.index):
+            return None
+        index = BitmapIndex(version, self.size)
+        index.bitmaps = {col: dict(values) for col, values in self.bitmaps.items()}
+        index.trainers = dict(self.trainers)
+        copied = set()
+        def writable(table, key, owner):
+            if (owner, key) not in copied:
+                table[key] = table[key].copy() if key in table else np.zeros((self.size + 7) // 8, dtype=np.uint8)
+                copied.add((owner, key))
+            return table[key]
+        for position in current.index.get_indexer(list(changed)):
+            if position < 0:
+                continue
+            for col, values in index.bitmaps.items():
+                old, new = current[col].iat[position], updated[col].iat[position]
+                if not pd.isna(old) and old in values:
+                    self._flip(writable(values, old, col), position, False)
+                if not pd.isna(new):
+                    self._flip(writable(values, new, col), position, True)
+            for name in _trainer_names(current["Trainer Calendar"].iat[position]):
+                if name in index.trainers:
+                    self._flip(writable(index.trainers, name, None), position, False)
+            for name in _trainer_names(updated["Trainer Calendar"].iat[position]):
+                self._flip(writable(index.trainers, name, None), position, True)
+        return index
+
+    def matches(self, df0):
+        return self.version == df0.attrs.get("version") and self.size == len(df0)
+
+    def select(self, values, trainer=None, rows=None):
+        """Positions of the rows matching every (column, value) in values and,
+        if given, listing trainer, within the position range rows (start, stop)."""
+        selected = np.full((self.size + 7) // 8, 0xFF, dtype=np.uint8)
+        for col, value in values.items():
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is None:
+                return np.empty(0, dtype=int)
+            selected &= bitmap
+        if trainer is not None:
+            bitmap = self.trainers.get(trainer)
+            if bitmap is None:
+                return np.empty(0, dtype=int)
+            selected &= bitmap
+        flags = np.unpackbits(selected, count=self.size).astype(bool)
+        if rows is not None:
+            flags[:rows[0]] = False
+            flags[rows[1]:] = False
+        return np.flatnonzero(flags)
+
+def _trigram_postings(texts):
+    """(alphabet, keys, offsets, entries) for texts, or None if the keys
+    would not fit in 64 bits.
+
+    alphabet holds the code points that occur, so a trigram of dense
+    character numbers (a, b, c) has key (a * A + b) * A + c. keys are the
+    sorted distinct keys and key i occurs in the texts at positions
+    entries[offsets[i]:offsets[i + 1]] (ascending). Built with array
+    operations: one sort of (key, text) pairs packed into single integers.
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+    if len(codes) < 3:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint64), \
+            np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64)
+    seen = np.bincount(codes)
+    alphabet = np.flatnonzero(seen).astype(np.uint32)
+    if len(alphabet) ** 3 * len(texts) >= 2 ** 64:
+        # Too many distinct characters to pack; the column is checked directly
+        return None
+    size, count = np.uint64(len(alphabet)), np.uint64(len(texts))
+    number = np.zeros(len(seen), dtype=np.uint64)
+    number[alphabet] = np.arange(len(alphabet), dtype=np.uint64)
+    dense = number[codes]
+    entries = np.repeat(np.arange(len(texts), dtype=np.uint64), lengths)
+    keys = (dense[:-2] * size + dense[1:-1]) * size + dense[2:]
+    # Drop the trigrams that run from one text into the next
+    inside = entries[:-2] == entries[2:]
+    pairs = np.sort(keys[inside] * count + entries[:-2][inside])
+    pairs = pairs[np.append(True, pairs[1:] != pairs[:-1])]
+    keys, entries = pairs // count, (pairs % count).astype(np.int64)
+    starts = np.flatnonzero(np.append(True, keys[1:] != keys[:-1]))
+    return alphabet, keys[starts], np.append(starts, len(keys)), entries
+
+class TextIndex:
+    """Trigram postings of the lowercased text columns, for case-insensitive
+    substring search over the rows of one events frame.
+
+    Each column is kept as its distinct lowercased texts plus, per row
+    position, the code of its text; postings point at texts, so a client
+    named on thousands of rows is indexed once. A query of three or more
+    characters intersects its trigrams' postings and checks the few texts
+    left; shorter queries, and frames small enough that checking their own
+    texts is cheaper, check those directly. Rows of frames cut from another
+    version (e.g. archived events) are scanned.
+
+    A write that only changes values appends the changed rows' new texts
+    and marks them dirty: dirty texts are always candidates, so the postings
+    (built once per version) never need updating. Once many texts are dirty
+    the index is rebuilt instead.
+    """
+
+    MAX_DIRTY = 1024
+
+    def __init__(self, version, ids):
+        self.version = version
+        self.ids = ids
+        # col -> (codes per row position, -1 for no text; distinct texts)
+        self.texts = {}
+        self.grams = {}
+        self.dirty = {}
+
+    @classmethod
+    def from_frame(cls, df0, columns):
+        index = cls(df0.attrs.get("version"), df0.index)
+        for col in columns:
+            codes, values = pd.factorize(df0[col].astype(object))
+            values = np.array([str(value).lower() for value in values], dtype=object)
+            index.texts[col] = (codes.astype(np.int32), values)
+            index.grams[col] = _trigram_postings(values)
+            index.dirty[col] = np.empty(0, dtype=np.int64)
+        return index
+
+    def updated(self, current, updated, changed, version):
+        """The index for updated, written from current (this index's frame)
+        by changing the Event IDs in changed; None when rows were added,
+        removed or reordered, or too many texts are dirty."""
+        if not updated.index.equals(current.index):
+            return None
+        positions = current.index.get_indexer(list(changed))
+        positions = positions[positions >= 0]
+        index = TextIndex(version, updated.index)
+        index.grams = self.grams
+        for col, (codes, values) in self.texts.items():
+            new = [updated[col].iat[position] for position in positions]
+            kept = [i for i, value in enumerate(new) if not pd.isna(value)]
+            appended = len(values) + np.arange(len(kept))
+            codes = codes.copy()
+            codes[positions] = -1
+            codes[positions[kept]] = appended
+            dirty = np.append(self.dirty[col], appended)
+            if len(dirty) > self.MAX_DIRTY:
+                return None
+            added = np.array([str(new[i]).lower() for i in kept], dtype=object)
+            index.texts[col] = (codes, np.concatenate([values, added]))
+            index.dirty[col] = dirty
+        return index
+
+    def _postings(self, col, gram):
+        alphabet, keys, offsets, entries = self.grams[col]
+        points = [ord(ch) for ch in gram]
+        dense = np.searchsorted(alphabet, points)
+        if (dense >= len(alphabet)).any() or (alphabet[dense] != points).any():
+            # A character no text contains
+            return entries[:0]
+        size = len(alphabet)
+        key = np.uint64((int(dense[0]) * size + int(dense[1])) * size + int(dense[2]))
+        i = np.searchsorted(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return entries[offsets[i]:offsets[i + 1]]
+        return entries[:0]
+
+    def _candidates(self, query, col, limit):
+        """Codes of the texts of col that may contain query, or None when
+        the postings are longer than limit (checking limit texts directly
+        is cheaper) or col has none."""
+        if self.grams[col] is None:
+            return None
+        postings = sorted(
+            (self._postings(col, query[i:i + 3]) for i in range(len(query) - 2)), key=len
+        )
+        if len(postings[0]) > limit:
+            return None
+        found = postings[0]
+        for entries in postings[1:]:
+            if not len(found):
+                break
+            found = np.intersect1d(found, entries, assume_unique=True)
+        return np.union1d(found, self.dirty[col])
+
+    def mask(self, frame, query, columns):
+        """Boolean array: which rows of frame contain query in any of columns."""
+        query = query.lower()
+        positions = _positions(self.ids, self.version, frame)
+        known = positions >= 0
+        hit = np.zeros(len(frame), dtype=bool)
+        if known.any():
+            found = np.zeros(known.sum(), dtype=bool)
+            for col in columns:
+                codes, values = self.texts[col]
+                row_codes = codes[positions[known]]
+                candidates = np.unique(row_codes[row_codes >= 0])
+                if len(query) >= 3:
+                    posted = self._candidates(query, col, len(candidates))
+                    if posted is not None:
+                        candidates = posted
+                # One slot past the texts for rows without text
+                matched = np.zeros(len(values) + 1, dtype=bool)
+                matched[[c for c in candidates if query in values[c]]] = True
+                found |= matched[row_codes]
+            hit[known] = found
+        if not known.all():
+            rest = frame[~known]
+            hit[~known] = np.any([
+                np.fromiter((not pd.isna(value) and query in str(value).lower() for value in rest[col]),
+                            dtype=bool, count=len(rest))
+                for col in columns
+            ], axis=0)
+        return hit
@@ -0,0 +1,62 @@
+import os, json
+from .config import JOURNAL_FILE
+from .snapshot import new_snapshot
+
+# One JSON line per committed change to the events: every insert, update and
+# delete with the row values before and after it. The workbook is the base
+# the journal applies to, so entries can be dropped from the front (compacted)
+# at any time without losing data, only the ability to rewind past them.
+# The first line is a marker {"ts": ..., "start": true}: every change since
+# that time is in the journal.
+
+# (mtime_ns, size) and entries of the last read, so reruns that only list
+# recent changes do not reparse an unchanged file
+_cache = (None, [])
+
+def _marker(ts):
+    return {"ts": ts, "start": True}
+
+def append(entry):
+    """Append one batch. Callers hold the storage write lock, so the file
+    order is the commit order."""
+    lines = [entry] if os.path.exists(JOURNAL_FILE) else [_marker(entry["ts"]), entry]
+    with open(JOURNAL_FILE, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e, default=str) + "\n" for e in lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+def covers_from(entries):
+    """The time from which entries (as read) hold every change, or None."""
+    return entries[0]["ts"] if entries and entries[0].get("start") else None
+
+def read_entries():
+    """Return every line, oldest first, starting with the marker. The list
+    is shared between callers; do not modify it."""
+    global _cache
+    try:
+        st = os.stat(JOURNAL_FILE)
+    except FileNotFoundError:
+        return []
+    signature = (st.st_mtime_ns, st.st_size)
+    if _cache[0] == signature:
+        return _cache[1]
+    entries = []
+    with open(JOURNAL_FILE, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A torn last line from a crash mid-write; skip it
+                continue
+    _cache = (signature, entries)
+    return entries
+
+def replace_entries(entries, start):
+    """Rewrite the journal atomically as entries covering changes from start
+    on (compaction). Callers hold the write lock."""
+    entries = [_marker(start)] + [e for e in entries if not e.get("start")]
+    with new_snapshot(JOURNAL_FILE) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e, default=str) + "\n" for e in entries))
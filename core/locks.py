@@ -0,0 +1,81 @@
+import fcntl, os, threading, time
+from contextlib import contextmanager
+
+class LockTimeout(TimeoutError):
+    """Raised when a storage lock could not be acquired within its timeout."""
+
+class FileLock:
+    """Cross-process writer lock built on flock().
+
+    Only writers take it: they publish complete files by atomic rename (see
+    core.snapshot), so readers need no lock and never wait behind a write.
+    A thread that already holds the lock can re-enter it. Acquisition never
+    blocks past its timeout; LockTimeout is raised instead.
+    """
+
+    def __init__(self, path, timeout=15.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"acquired": 0, "timeouts": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+
+    def _flock(self, deadline):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        delay = 0.001
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise LockTimeout(f"Timed out waiting for lock on {self.path}")
+                    time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+                    delay = min(delay * 2, 0.05)
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def _record(self, started, timed_out=False):
+        waited = (time.monotonic() - started) * 1000
+        with self._stats_lock:
+            s = self._stats
+            if timed_out:
+                s["timeouts"] += 1
+            else:
+                s["acquired"] += 1
+            s["total_wait_ms"] += waited
+            s["max_wait_ms"] = max(s["max_wait_ms"], waited)
+
+    @contextmanager
+    def exclusive(self, timeout=None):
+        if getattr(self._local, "held", False):
+            yield
+            return
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        try:
+            fd = self._flock(deadline)
+        except LockTimeout:
+            self._record(started, timed_out=True)
+            raise
+        self._record(started)
+        self._local.held = True
+        try:
+            yield
+        finally:
+            self._local.held = False
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+
+    def stats(self):
+        """Acquisition count, timeouts and lock-wait times (ms)."""
+        with self._stats_lock:
+            out = dict(self._stats)
+        out["avg_wait_ms"] = out["total_wait_ms"] / out["acquired"] if out["acquired"] else 0.0
+        for k in ("total_wait_ms", "max_wait_ms", "avg_wait_ms"):
+            out[k] = round(out[k], 2)
+        return out
@@ -1,26 +1,10 @@
 import html
-import pandas as pd
 import streamlit as st
-from .utils import marked_for_includes
 from datetime import datetime
 
-def is_date_blocked_for_trainer(df_all, date_obj, trainer):
-    # Check if "Is Marked" column exists, default to False if not
-    is_marked = df_all["Is Marked"] if "Is Marked" in df_all.columns else False
-    marks = df_all[
-        (is_marked == True) &
-        (pd.to_datetime(df_all["Date"]).dt.date == date_obj)
-    ]
-    for _, m in marks.iterrows():
-        if marked_for_includes(m.get("Marked For", "All"), trainer):
-            return True
-    return False
-
 def render_mixed_calendar_cell(day, day_events, TRAINERS, TRAINER_COLORS):
-    # Check if "Is Marked" column exists, default to False if not
-    is_marked = day_events["Is Marked"] if "Is Marked" in day_events.columns else False
-    marked_event = day_events[is_marked == True]
-    normal_events = day_events[is_marked != True]
+    marked_event = day_events[day_events["Is Marked"]]
+    normal_events = day_events[~day_events["Is Marked"]]
 
     badges = []
     if len(marked_event):
@@ -0,0 +1,55 @@
+import os, shutil, tempfile
+from contextlib import contextmanager
+
+# mkstemp creates 0600 files. A file made for the first time gets the mode a
+# plain open() would give it instead, so other workers can read it. Reading
+# the umask means setting it, so do that once, before any threads start.
+_umask = os.umask(0)
+os.umask(_umask)
+NEW_FILE_MODE = 0o666 & ~_umask
+
+def _fsync_dir(directory):
+    # Make the rename itself durable; not every platform can open a directory
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+@contextmanager
+def new_snapshot(path, copy_current=False):
+    """Yield a temp path next to path; on success it replaces path atomically.
+
+    The caller writes the complete new file to the temp path. When the block
+    exits cleanly the temp file is fsynced and renamed over path, so a reader
+    that opens path sees either the old file or the new one, never a partial
+    write. With copy_current the temp file starts as a copy of path, for
+    writers that only change part of it. On error the temp file is removed
+    and path is left untouched.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    base, ext = os.path.splitext(os.path.basename(path))
+    # Keep the extension: openpyxl refuses to open files it does not recognise
+    fd, tmp = tempfile.mkstemp(prefix=f".{base}.", suffix=f".tmp{ext}", dir=directory)
+    os.close(fd)
+    try:
+        if os.path.exists(path):
+            if copy_current:
+                shutil.copyfile(path, tmp)
+            shutil.copymode(path, tmp)
+        else:
+            os.chmod(tmp, NEW_FILE_MODE)
+        yield tmp
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        _fsync_dir(directory)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -0,0 +1,235 @@
+import os, json, sqlite3
+from contextlib import contextmanager
+import pandas as pd
+from .config import SQLITE_FILE, EVENTS_SHEET, SHEETS
+
+# Declared column types. BOOLEAN/TIMESTAMP/JSON are decoded back to the
+# Python types the pages expect; JSON keeps mixed Key/Value cells (True vs
+# "Offered") exactly as they were written.
+EVENT_COLUMN_TYPES = {"Date": "TIMESTAMP", "Is Marked": "BOOLEAN"}
+EVENT_INDEXES = ["Date", "Trainer Calendar", "Is Marked", "Event ID"]
+
+@contextmanager
+def connect():
+    """Open a connection that commits on success and always closes."""
+    conn = sqlite3.connect(SQLITE_FILE, timeout=30)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def _q(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _column_type(table, column, series):
+    if table == EVENTS_SHEET:
+        return EVENT_COLUMN_TYPES.get(column, "TEXT")
+    if pd.api.types.is_bool_dtype(series):
+        return "BOOLEAN"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "TIMESTAMP"
+    if pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL"
+    return "JSON"
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+def _encode(value, kind):
+    if not isinstance(value, (list, dict)) and pd.isna(value):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if kind == "TIMESTAMP":
+        ts = pd.to_datetime(value, errors="coerce")
+        return None if pd.isna(ts) else ts.isoformat(sep=" ")
+    if kind == "BOOLEAN":
+        return int(_to_bool(value))
+    if kind == "INTEGER":
+        return int(value)
+    if kind == "REAL":
+        return float(value)
+    if kind == "JSON":
+        return json.dumps(value, default=str)
+    return str(value)
+
+def _decode_column(series, kind):
+    if kind == "BOOLEAN":
+        return series.map(lambda v: bool(v) if v is not None and not pd.isna(v) else False).astype(bool)
+    if kind == "TIMESTAMP":
+        return pd.to_datetime(series, errors="coerce")
+    if kind == "JSON":
+        return series.map(lambda v: json.loads(v) if isinstance(v, str) else v)
+    return series.astype(object).where(series.notna(), float("nan"))
+
+def _column_kinds(conn, table):
+    rows = conn.execute(f"PRAGMA table_info({_q(table)})").fetchall()
+    return {r[1]: (r[2] or "TEXT").upper() for r in rows}
+
+def table_exists(name):
+    with connect() as conn:
+        return _table_exists(conn, name)
+
+def _table_exists(conn, name):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+    ).fetchone()
+    return row is not None
+
+def _read_table(conn, name):
+    kinds = _column_kinds(conn, name)
+    df = pd.read_sql_query(f"SELECT * FROM {_q(name)} ORDER BY rowid", conn)
+    for col in df.columns:
+        df[col] = _decode_column(df[col], kinds.get(col, "TEXT"))
+    return df
+
+def _write_table(conn, name, df):
+    kinds = {c: _column_type(name, c, df[c]) for c in df.columns}
+    conn.execute(f"DROP TABLE IF EXISTS {_q(name)}")
+    cols_sql = ", ".join(f"{_q(c)} {kinds[c]}" for c in df.columns)
+    conn.execute(f"CREATE TABLE {_q(name)} ({cols_sql})")
+    if len(df.columns):
+        placeholders = ", ".join("?" for _ in df.columns)
+        rows = (
+            [_encode(v, kinds[c]) for c, v in zip(df.columns, rec)]
+            for rec in df.itertuples(index=False, name=None)
+        )
+        conn.executemany(f"INSERT INTO {_q(name)} VALUES ({placeholders})", rows)
+    if name == EVENTS_SHEET:
+        for col in EVENT_INDEXES:
+            if col in kinds:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_q('idx_events_' + col.replace(' ', '_').lower())} "
+                    f"ON {_q(name)} ({_q(col)})"
+                )
+
+def read_table(name):
+    with connect() as conn:
+        return _read_table(conn, name)
+
+def read_events_between(start, end):
+    """Events with start <= Date < end, via the Date index."""
+    with connect() as conn:
+        if not _table_exists(conn, EVENTS_SHEET):
+            return pd.DataFrame()
+        kinds = _column_kinds(conn, EVENTS_SHEET)
+        df = pd.read_sql_query(
+            f"SELECT * FROM {_q(EVENTS_SHEET)} WHERE {_q('Date')} >= ? AND {_q('Date')} < ? ORDER BY rowid",
+            conn,
+            params=(_encode(start, "TIMESTAMP"), _encode(end, "TIMESTAMP")),
+        )
+    for col in df.columns:
+        df[col] = _decode_column(df[col], kinds.get(col, "TEXT"))
+    return df
+
+def write_table(name, df):
+    """Replace a table with df in one transaction."""
+    write_tables({name: df})
+
+def write_tables(frames):
+    """Replace several tables ({name: df}) in one transaction."""
+    with connect() as conn:
+        for name, df in frames.items():
+            _write_table(conn, name, df)
+
+def append_rows(name, rows):
+    """Insert rows (dicts) without touching the rest of the table."""
+    if not rows:
+        return
+    with connect() as conn:
+        kinds = _column_kinds(conn, name)
+        cols = [c for c in rows[0] if c in kinds]
+        conn.executemany(
+            f"INSERT INTO {_q(name)} ({', '.join(_q(c) for c in cols)}) "
+            f"VALUES ({', '.join('?' for _ in cols)})",
+            ([_encode(row.get(c), kinds[c]) for c in cols] for row in rows),
+        )
+
+def _add_missing_columns(conn, name, columns, kinds):
+    for col in columns:
+        if col not in kinds:
+            kinds[col] = EVENT_COLUMN_TYPES.get(col, "TEXT") if name == EVENTS_SHEET else "JSON"
+            conn.execute(f"ALTER TABLE {_q(name)} ADD COLUMN {_q(col)} {kinds[col]}")
+
+def apply_event_changes(inserts, updates, deletes, tables=None):
+    """Insert, update and delete Events rows by Event ID in one transaction.
+
+    tables ({name: df}) are replaced in the same transaction, so the Meta
+    version stamp commits together with the rows it describes.
+    """
+    with connect() as conn:
+        for name, df in (tables or {}).items():
+            _write_table(conn, name, df)
+        kinds = _column_kinds(conn, EVENTS_SHEET)
+        key = _q("Event ID")
+        if deletes:
+            conn.executemany(
+                f"DELETE FROM {_q(EVENTS_SHEET)} WHERE {key} = ?",
+                [(event_id,) for event_id in deletes],
+            )
+        for event_id, changes in updates.items():
+            _add_missing_columns(conn, EVENTS_SHEET, changes, kinds)
+            conn.execute(
+                f"UPDATE {_q(EVENTS_SHEET)} SET {', '.join(f'{_q(c)} = ?' for c in changes)} "
+                f"WHERE {key} = ?",
+                [_encode(v, kinds[c]) for c, v in changes.items()] + [event_id],
+            )
+        if inserts is not None and len(inserts):
+            cols = list(inserts.columns)
+            _add_missing_columns(conn, EVENTS_SHEET, cols, kinds)
+            conn.executemany(
+                f"INSERT INTO {_q(EVENTS_SHEET)} ({', '.join(_q(c) for c in cols)}) "
+                f"VALUES ({', '.join('?' for _ in cols)})",
+                (
+                    [_encode(v, kinds[c]) for c, v in zip(cols, rec)]
+                    for rec in inserts.itertuples(index=False, name=None)
+                ),
+            )
+
+def ensure_database(default_sheets):
+    """Create any missing tables from default_sheets ({name: empty DataFrame})."""
+    with connect() as conn:
+        for name, df in default_sheets.items():
+            if not _table_exists(conn, name):
+                _write_table(conn, name, df)
+
+def import_from_excel(source):
+    """Load every sheet of an xlsx workbook (path or file-like) into the database."""
+    with pd.ExcelFile(source, engine="openpyxl") as xl:
+        frames = {name: xl.parse(name) for name in xl.sheet_names}
+    with connect() as conn:
+        for name, df in frames.items():
+            _write_table(conn, name, df)
+    return list(frames)
+
+def export_to_excel(target):
+    """Write every table to an xlsx workbook (path or file-like) in the app's layout."""
+    with connect() as conn:
+        names = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
+        )]
+        order = [EVENTS_SHEET] + SHEETS
+        names.sort(key=lambda n: order.index(n) if n in order else len(order))
+        frames = {name: _read_table(conn, name) for name in names}
+    with pd.ExcelWriter(target, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return list(frames)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Move data between the xlsx workbook and SQLite.")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("xlsx", help="Workbook to import from or export to")
+    args = parser.parse_args()
+    if args.action == "import":
+        if not os.path.exists(args.xlsx):
+            parser.error(f"{args.xlsx} not found")
+        print(f"Imported sheets: {', '.join(import_from_excel(args.xlsx))}")
+    else:
+        print(f"Exported sheets: {', '.join(export_to_excel(args.xlsx))}")
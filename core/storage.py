@@ -1,37 +1,103 @@
-import os, time, shutil
+import os, time, json, shutil, logging, uuid, tempfile
+import numpy as np
 import pandas as pd
+from io import BytesIO
 from datetime import datetime
 from openpyxl import load_workbook
-from .config import EXCEL_FILE, EVENTS_SHEET, SHEETS
+from .config import EXCEL_FILE, EVENTS_SHEET, META_SHEET, SHEETS, STORAGE_BACKEND, SQLITE_FILE, LOCK_TIMEOUT, EVENTS_SNAPSHOT_FILE, ARCHIVE_AFTER_DAYS, JOURNAL_KEEP_DAYS, BACKUP_KEEP_LAST, BACKUP_KEEP_DAILY_DAYS, BACKUP_KEEP_WEEKLY_WEEKS
 from .security import hash_password
-import fcntl
+from .event_store import event_store, archive_store, file_signature
+from . import sqlite_backend, audit_log, columnar, archive, journal, indexes
+from .audit_writer import AuditWriter
+from .locks import FileLock
+from .snapshot import new_snapshot, NEW_FILE_MODE
+from .backups import BackupStore
+
+USE_SQLITE = STORAGE_BACKEND == "sqlite"
+
+# Readers of the workbook share this lock; every storage write (either
+# backend) takes it exclusively, so the event store's post-write file
+# signature always belongs to this process's own write.
+workbook_lock = FileLock(f"{EXCEL_FILE}.lock", timeout=LOCK_TIMEOUT)
 
 BACKUP_DIR = "backups"
+backup_store = BackupStore(BACKUP_DIR, f"{os.path.splitext(EXCEL_FILE)[0]}_backup_")
 
 EVENT_COLUMNS = [
     "Title", "Date", "Type", "Status", "Source",
     "Client", "Course/Description", "Trainer Calendar", "Medium", "Location",
     "Billing", "Invoiced", "Notes", "Date Modified",
-    "Action Type", "Modified By", "Is Marked", "Marked For"
+    "Action Type", "Modified By", "Is Marked", "Marked For", "Event ID"
 ]
+EVENT_ID = "Event ID"
+
+# Typed event schema, applied once by _normalize_events: list-backed columns
+# are categoricals, Is Marked is a real bool, Date is datetime64 and Day is
+# Date at midnight for whole-day comparisons. Day is derived on load and is
+# never stored.
+EVENT_CATEGORY_COLUMNS = ["Type", "Status", "Source", "Medium", "Location"]
+DAY = "Day"
+DERIVED_EVENT_COLUMNS = [DAY]
+# Columns the list tabs filter on, each with a bitmap per value (see select_events)
+BITMAP_COLUMNS = EVENT_CATEGORY_COLUMNS + ["Is Marked"]
+
+# Every events write bumps events_version in the Meta sheet and records which
+# Event IDs it touched (None: all of them) in events_history, newest last.
+# The history is trimmed to fit one Excel cell.
+EVENTS_HISTORY_MAX_CHARS = 30000
+
+class ConflictError(Exception):
+    """A versioned events save touched rows that changed since its version."""
+
+    def __init__(self, message, event_ids=()):
+        super().__init__(message)
+        self.event_ids = list(event_ids)
+
+# Settings sheets returned by load_settings(), in order, with their columns
+SETTINGS_COLUMNS = {
+    "Users": ["Email", "Role", "TrainerName", "Active", "Password"],
+    "Trainers": ["Name", "Color", "Active"],
+    "Lists": ["Category", "Value", "Active"],
+    "Rules": ["Key", "Value"],
+    "Defaults": ["Key", "Value"],
+    "Notifications": ["Key", "Value"],
+}
+
+def _default_sheets():
+    """Empty frames for every sheet of a new workbook, in workbook order."""
+    sheets = {EVENTS_SHEET: pd.DataFrame(columns=EVENT_COLUMNS)}
+    for name, columns in SETTINGS_COLUMNS.items():
+        sheets[name] = pd.DataFrame(columns=columns)
+    sheets["Audit"] = pd.DataFrame(columns=["Timestamp", "User", "Action", "Details"])
+    sheets[META_SHEET] = pd.DataFrame(columns=["Key", "Value"])
+    return sheets
 
 def ensure_workbook():
+    if USE_SQLITE:
+        if not os.path.exists(SQLITE_FILE):
+            if os.path.exists(EXCEL_FILE):
+                # First start on SQLite: carry the existing workbook over
+                sqlite_backend.import_from_excel(EXCEL_FILE)
+            sqlite_backend.ensure_database(_default_sheets())
+        return
     if not os.path.exists(EXCEL_FILE):
-        with pd.ExcelWriter(EXCEL_FILE, engine="openpyxl") as writer:
-            pd.DataFrame(columns=EVENT_COLUMNS).to_excel(writer, sheet_name=EVENTS_SHEET, index=False)
-            pd.DataFrame(columns=["Email", "Role", "TrainerName", "Active", "Password"]).to_excel(writer, sheet_name="Users", index=False)
-            pd.DataFrame(columns=["Name", "Color", "Active"]).to_excel(writer, sheet_name="Trainers", index=False)
-            pd.DataFrame(columns=["Category", "Value", "Active"]).to_excel(writer, sheet_name="Lists", index=False)
-            pd.DataFrame(columns=["Key", "Value"]).to_excel(writer, sheet_name="Rules", index=False)
-            pd.DataFrame(columns=["Key", "Value"]).to_excel(writer, sheet_name="Defaults", index=False)
-            pd.DataFrame(columns=["Key", "Value"]).to_excel(writer, sheet_name="Notifications", index=False)
-            pd.DataFrame(columns=["Timestamp", "User", "Action", "Details"]).to_excel(writer, sheet_name="Audit", index=False)
+        with workbook_lock.exclusive():
+            if os.path.exists(EXCEL_FILE):
+                return
+            with new_snapshot(EXCEL_FILE) as tmp, pd.ExcelWriter(tmp, engine="openpyxl") as writer:
+                for name, df in _default_sheets().items():
+                    df.to_excel(writer, sheet_name=name, index=False)
 
 def sheet_exists(sheet_name):
+    if USE_SQLITE:
+        return sqlite_backend.table_exists(sheet_name)
     if not os.path.exists(EXCEL_FILE):
         return False
-    wb = load_workbook(EXCEL_FILE)
-    return sheet_name in wb.sheetnames
+    wb = load_workbook(EXCEL_FILE, read_only=True)
+    try:
+        return sheet_name in wb.sheetnames
+    finally:
+        wb.close()
 
 def read_sheet(sheet_name, default_df, allow_empty_on_error=False):
     """Read a sheet from the Excel file.
@@ -43,11 +109,15 @@ def read_sheet(sheet_name, default_df, allow_empty_on_error=False):
                               to prevent data loss from silent failures
     """
     ensure_workbook()
-    if not sheet_exists(sheet_name):
-        write_sheet(sheet_name, default_df)
-        return default_df.copy()
     try:
-        df = pd.read_excel(EXCEL_FILE, sheet_name=sheet_name, engine="openpyxl")
+        if USE_SQLITE:
+            df = sqlite_backend.read_table(sheet_name) if sqlite_backend.table_exists(sheet_name) else None
+        else:
+            with pd.ExcelFile(EXCEL_FILE, engine="openpyxl") as xl:
+                df = xl.parse(sheet_name) if sheet_name in xl.sheet_names else None
+        if df is None:
+            write_sheet(sheet_name, default_df)
+            return default_df.copy()
         # Safety check: if we expect data but got empty, log a warning
         if len(df) == 0 and sheet_name == "Users":
             # For Users sheet, empty is suspicious - could indicate a read problem
@@ -62,30 +132,133 @@ def read_sheet(sheet_name, default_df, allow_empty_on_error=False):
             raise RuntimeError(f"Failed to read sheet '{sheet_name}': {e}") from e
 
 def write_sheet(sheet_name, df):
+    """Replace one sheet. Raises LockTimeout rather than writing unlocked."""
     ensure_workbook()
-    lock_file = f"{EXCEL_FILE}.lock"
-    try:
-        with open(lock_file, "w") as lock:
-            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
-            try:
-                with pd.ExcelWriter(EXCEL_FILE, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-            finally:
-                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
-    except Exception:
-        # Fallback without locking if lock fails
-        with pd.ExcelWriter(EXCEL_FILE, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    with workbook_lock.exclusive():
+        try:
+            if USE_SQLITE:
+                sqlite_backend.write_table(sheet_name, df)
+            else:
+                _write_workbook_sheets({sheet_name: df})
+        finally:
+            event_store.invalidate()
+
+def _write_workbook_sheets(frames):
+    """Write {sheet: df} into a new snapshot of the workbook and swap it in.
+
+    Callers hold workbook_lock exclusively. The live file is never modified
+    in place, so readers always open a complete workbook. The Events Arrow
+    snapshot is then published for the new workbook (or re-stamped if the
+    events did not change); an Events write must include the Meta sheet.
+    Returns True if the Arrow snapshot matches the new workbook.
+    """
+    before = os.stat(EXCEL_FILE)
+    with new_snapshot(EXCEL_FILE, copy_current=True) as tmp:
+        with pd.ExcelWriter(tmp, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            for name, df in frames.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+        # os.replace keeps the mtime, so the key taken here holds for EXCEL_FILE
+        key = columnar.file_key(tmp) if columnar.HAVE_ARROW else None
+    if key is None:
+        return False
+    meta = _meta_dict(frames[META_SHEET]) if META_SHEET in frames else None
+    if EVENTS_SHEET not in frames:
+        return columnar.carry_forward(EVENTS_SNAPSHOT_FILE, before, key, meta)
+    events = frames[EVENTS_SHEET]
+    # Only normalized frames (datetime Date, sorted) can be partitioned by month
+    if meta is None or "Date" not in events or not pd.api.types.is_datetime64_any_dtype(events["Date"]):
+        columnar.discard(EVENTS_SNAPSHOT_FILE)
+        return False
+    return columnar.publish(EVENTS_SNAPSHOT_FILE, events, key, meta, _month_ranges(events))
+
+def _write_audit_batch(entries):
+    if USE_SQLITE:
+        ensure_workbook()
+        if not sqlite_backend.table_exists("Audit"):
+            sqlite_backend.write_table("Audit", pd.DataFrame(columns=audit_log.AUDIT_COLUMNS))
+        sqlite_backend.append_rows("Audit", entries)
+    else:
+        audit_log.append_entries(entries)
+
+audit_writer = AuditWriter(_write_audit_batch)
 
 def append_audit(user, action, details=""):
-    audit_df = read_sheet("Audit", pd.DataFrame(columns=["Timestamp","User","Action","Details"]))
-    audit_df.loc[len(audit_df)] = {
+    """Queue an audit entry; the background audit_writer persists it."""
+    audit_writer.submit({
         "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "User": user,
         "Action": action,
         "Details": details
-    }
-    write_sheet("Audit", audit_df)
+    })
+
+def read_audit(flush=True):
+    """Return the audit trail as a DataFrame, oldest first. flush=False
+    reads what is already written instead of waiting for queued entries."""
+    if flush:
+        audit_writer.flush()
+    if USE_SQLITE:
+        return read_sheet("Audit", pd.DataFrame(columns=audit_log.AUDIT_COLUMNS))
+    return audit_log.read_entries()
+
+def export_audit_sheet():
+    """Copy the audit log into the workbook's Audit sheet. Returns the row count."""
+    audit_df = read_audit()
+    if not USE_SQLITE:
+        write_sheet("Audit", audit_df)
+    return len(audit_df)
+
+def _audit_key(entry):
+    return tuple("" if pd.isna(entry.get(c)) else str(entry.get(c)) for c in audit_log.AUDIT_COLUMNS)
+
+def migrate_audit_sheet():
+    """Move the rows of the old Audit sheet into the append-only audit log.
+
+    This runs again when a restore or import resets the schema version, and
+    the sheet may then hold rows already in the log (an older backup, or an
+    export_audit_sheet copy), so those are not added twice.
+    """
+    if USE_SQLITE:
+        return
+    audit_df = read_sheet("Audit", pd.DataFrame(columns=audit_log.AUDIT_COLUMNS))
+    logged = audit_log.read_entries().to_dict("records")
+    seen = {_audit_key(e) for e in logged}
+    entries = [
+        {c: (None if pd.isna(r.get(c)) else r.get(c)) for c in audit_log.AUDIT_COLUMNS}
+        for _, r in audit_df.iterrows()
+    ]
+    entries = [e for e in entries if _audit_key(e) not in seen]
+    if entries:
+        # Anything already in the log was written after the sheet's last row
+        audit_log.replace_entries(entries + logged)
+
+def _meta_dict(meta_df):
+    return {r["Key"]: r["Value"] for _, r in meta_df.iterrows()}
+
+def _meta_frame(meta):
+    return pd.DataFrame(list(meta.items()), columns=["Key", "Value"])
+
+_meta_cache = (None, None)
+
+def read_meta(cached=False):
+    """Return the Meta sheet as a {key: value} dict.
+
+    With cached=True the last read is reused until the data file changes;
+    use it for display only, never to read-modify-write.
+    """
+    global _meta_cache
+    signature = file_signature(event_store.path)
+    if cached and signature is not None and _meta_cache[0] == signature:
+        return dict(_meta_cache[1])
+    meta = _meta_dict(read_sheets({META_SHEET: ["Key", "Value"]})[META_SHEET])
+    _meta_cache = (signature, meta)
+    return dict(meta)
+
+def write_meta(**values):
+    """Set one or more Meta keys, keeping the others."""
+    with workbook_lock.exclusive():
+        meta = read_meta()
+        meta.update(values)
+        write_sheet(META_SHEET, _meta_frame(meta))
 
 def migrate_plaintext_passwords():
     """Migrate any existing plaintext passwords to hashed passwords."""
@@ -219,138 +392,924 @@ def seed_defaults_if_empty():
         ], columns=["Key","Value"])
         write_sheet("Notifications", notif_df)
 
+def read_sheets(sheet_columns):
+    """Read several sheets with a single open of the workbook.
+
+    The workbook is opened once in read-only, values-only mode and each sheet
+    is parsed from that handle. Missing sheets are created from their default
+    columns. Returns {sheet_name: DataFrame}.
+    """
+    ensure_workbook()
+    if USE_SQLITE:
+        return {name: read_sheet(name, pd.DataFrame(columns=columns)) for name, columns in sheet_columns.items()}
+    started = time.perf_counter()
+    try:
+        with pd.ExcelFile(EXCEL_FILE, engine="openpyxl") as xl:
+            present = set(xl.sheet_names)
+            frames = {
+                name: xl.parse(name) for name in sheet_columns if name in present
+            }
+    except Exception as e:
+        raise RuntimeError(f"Failed to read sheets {list(sheet_columns)}: {e}") from e
+    for name, columns in sheet_columns.items():
+        if name not in frames:
+            frames[name] = pd.DataFrame(columns=columns)
+            write_sheet(name, frames[name])
+    logging.info(f"Read {len(frames)} sheet(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return frames
+
 def load_settings():
-    seed_defaults_if_empty()
-    users_df = read_sheet("Users", pd.DataFrame(columns=["Email","Role","TrainerName","Active","Password"]))
-    trainers_df = read_sheet("Trainers", pd.DataFrame(columns=["Name","Color","Active"]))
-    lists_df = read_sheet("Lists", pd.DataFrame(columns=["Category","Value","Active"]))
-    rules_df = read_sheet("Rules", pd.DataFrame(columns=["Key","Value"]))
-    defaults_df = read_sheet("Defaults", pd.DataFrame(columns=["Key","Value"]))
-    notif_df = read_sheet("Notifications", pd.DataFrame(columns=["Key","Value"]))
-    return users_df, trainers_df, lists_df, rules_df, defaults_df, notif_df
+    frames = read_sheets(SETTINGS_COLUMNS)
+    if len(frames["Users"]) == 0:
+        logging.warning("Read empty Users sheet - this may indicate a data issue")
+    return tuple(frames[name] for name in SETTINGS_COLUMNS)
 
 def load_events():
+    """Return a read-only view of the process-wide Events frame."""
     ensure_workbook()
-    max_retries = 3
-    for attempt in range(max_retries):
+    return event_store.view(_read_events)
+
+def new_event_id():
+    return uuid.uuid4().hex
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return False if pd.isna(value) else bool(value)
+
+def _stored_events(df0):
+    """df0 without the columns derived on load."""
+    return df0.drop(columns=DERIVED_EVENT_COLUMNS, errors="ignore")
+
+def _sort_by_date(df0):
+    """Order events by Date (undated last), keeping ties in stored order.
+
+    Every month is then one contiguous slice, which is what lets the
+    snapshot be partitioned by month and a month be cut out by searchsorted.
+    Already-sorted frames are returned as they are.
+    """
+    dates = df0["Date"]
+    dated = int(dates.notna().sum())
+    if dates.iloc[:dated].is_monotonic_increasing and dates.iloc[dated:].isna().all():
+        return df0
+    return df0.sort_values("Date", kind="stable", na_position="last")
+
+def _month_key(year, month):
+    return f"{int(year):04d}-{int(month):02d}"
+
+def _month_ranges(df0):
+    """{"YYYY-MM": (start, stop)} row ranges of a Date-sorted frame."""
+    labels = df0["Date"].dt.strftime("%Y-%m").fillna("undated").to_numpy()
+    if not len(labels):
+        return {}
+    bounds = [0] + (np.flatnonzero(labels[1:] != labels[:-1]) + 1).tolist() + [len(labels)]
+    return {labels[a]: (a, b) for a, b in zip(bounds[:-1], bounds[1:])}
+
+def _month_slice(df0, start, end):
+    first, stop = df0["Date"].searchsorted([start, end])
+    return df0.iloc[first:stop]
+
+def _normalize_events(df0):
+    for col in ["Modified By","Is Marked","Marked For",EVENT_ID]:
+        if col not in df0.columns:
+            df0[col] = "" if col!="Is Marked" else False
+    df0["Date"] = pd.to_datetime(df0["Date"], errors="coerce") if "Date" in df0.columns else pd.NaT
+    if df0["Is Marked"].dtype != bool:
+        df0["Is Marked"] = df0["Is Marked"].map(_as_bool).astype(bool)
+    # Empty text columns come back from Excel as float NaN; keep them
+    # writable with strings
+    for col in df0.columns:
+        if col not in ("Date", "Is Marked", DAY) and df0[col].dtype.kind == "f":
+            df0[col] = df0[col].astype(object)
+    for col in EVENT_CATEGORY_COLUMNS:
+        if col in df0.columns and not isinstance(df0[col].dtype, pd.CategoricalDtype):
+            df0[col] = df0[col].astype("category")
+    df0[DAY] = df0["Date"].dt.normalize()
+    df0 = _sort_by_date(df0)
+    # Rows added outside the app (or copied in Excel) get a fresh, unique ID
+    missing_id = (
+        df0[EVENT_ID].isna()
+        | (df0[EVENT_ID].astype(str).str.strip() == "")
+        | df0[EVENT_ID].duplicated()
+    )
+    if missing_id.any():
+        df0.loc[missing_id, EVENT_ID] = [new_event_id() for _ in range(int(missing_id.sum()))]
+    # Index rows by Event ID: lookups are hash-based and row labels (widget
+    # keys, selections) stay valid when other rows are added or deleted
+    df0.index = pd.Index(df0[EVENT_ID].astype(str), name=None)
+    cols = df0.columns.tolist()
+    if "Title" in cols:
+        cols.remove("Title")
+        df0 = df0[["Title"] + cols]
+    return df0
+
+def _events_version(meta):
+    try:
+        return int(meta.get("events_version", 0))
+    except (TypeError, ValueError):
+        return 0
+
+def _events_history(meta):
+    try:
+        return [tuple(entry) for entry in json.loads(meta.get("events_history") or "[]")]
+    except (TypeError, ValueError):
+        return []
+
+def _stamp_events(meta, touched):
+    """Return (version, meta) with the events version bumped and touched recorded."""
+    version = _events_version(meta) + 1
+    history = _events_history(meta) + [(version, None if touched is None else sorted(touched))]
+    text = json.dumps(history)
+    while len(text) > EVENTS_HISTORY_MAX_CHARS and len(history) > 1:
+        history = history[len(history) // 4 or 1:]
+        text = json.dumps(history)
+    if len(text) > EVENTS_HISTORY_MAX_CHARS:
+        text = json.dumps([(version, None)])
+    return version, dict(meta, events_version=version, events_history=text)
+
+def _changed_since(version, meta):
+    """Event IDs written after version, or None if the history does not say."""
+    current = _events_version(meta)
+    if version > current:
+        return None
+    history = dict(_events_history(meta))
+    changed = set()
+    for v in range(version + 1, current + 1):
+        ids = history.get(v)
+        if ids is None:
+            return None
+        changed.update(ids)
+    return changed
+
+def _check_version(expected_version, meta, touched):
+    """Raise ConflictError if rows in touched changed after expected_version.
+
+    Writes to other rows since then do not conflict: the changes are applied
+    on top of the latest data, which merges them at row level.
+    """
+    if expected_version is None or not touched:
+        return
+    if expected_version == _events_version(meta):
+        return
+    changed = _changed_since(expected_version, meta)
+    conflicts = set(touched) if changed is None else set(touched) & changed
+    if conflicts:
+        raise ConflictError(
+            f"{len(conflicts)} event(s) changed since you loaded them. Reload and try again.",
+            conflicts,
+        )
+
+def _read_events():
+    if USE_SQLITE:
+        df0 = read_sheet(EVENTS_SHEET, pd.DataFrame(columns=EVENT_COLUMNS))
+        meta = read_meta()
+    else:
+        # Writers swap in complete files by rename, so reads take no lock: one
+        # open sees one whole version and never waits behind a write
         try:
-            wb = load_workbook(EXCEL_FILE)
-            sheets = wb.sheetnames
-            if EVENTS_SHEET in sheets:
-                df0 = pd.read_excel(EXCEL_FILE, sheet_name=EVENTS_SHEET, engine="openpyxl")
+            started = time.perf_counter()
+            mapped = columnar.read_snapshot(EVENTS_SNAPSHOT_FILE, EXCEL_FILE)
+            if mapped is not None:
+                df0, meta = mapped
+                logging.info(f"Mapped events snapshot in {(time.perf_counter() - started) * 1000:.1f} ms")
             else:
-                fallback = next((s for s in sheets if "event" in s.lower()), sheets[0])
-                df0 = pd.read_excel(EXCEL_FILE, sheet_name=fallback, engine="openpyxl")
-                write_sheet(EVENTS_SHEET, df0)
+                df0, meta, key = _parse_events_sheet()
+                df0 = _normalize_events(df0)
+                # A write may have replaced the workbook while it was parsed;
+                # its writer publishes the snapshot for the new one
+                st = os.stat(EXCEL_FILE)
+                if columnar.HAVE_ARROW and (st.st_mtime_ns, st.st_size) == (key["mtime_ns"], key["size"]):
+                    stored = _stored_events(df0)
+                    columnar.publish(EVENTS_SNAPSHOT_FILE, stored, key, meta, _month_ranges(stored))
+        except Exception as e:
+            # Raise rather than return an empty frame that a later save would persist
+            raise RuntimeError(f"Failed to read events: {e}") from e
+    df0 = _normalize_events(df0)
+    df0.attrs["version"] = _events_version(meta)
+    return df0
 
-            for col in ["Modified By","Is Marked","Marked For"]:
-                if col not in df0.columns:
-                    df0[col] = "" if col!="Is Marked" else False
-            if len(df0) and "Date" in df0.columns:
-                df0["Date"] = pd.to_datetime(df0["Date"], errors="coerce")
-            cols = df0.columns.tolist()
-            if "Title" in cols:
-                cols.remove("Title")
-                df0 = df0[["Title"] + cols]
-            return df0
-        except PermissionError:
-            if attempt < max_retries-1:
-                time.sleep(1); continue
-            raise
-        except Exception:
-            if attempt < max_retries-1:
-                time.sleep(1); continue
-            return pd.DataFrame(columns=EVENT_COLUMNS)
-    return pd.DataFrame(columns=EVENT_COLUMNS)
+def _read_month(year, month):
+    """Read only one month of events. Used when the full frame is not loaded."""
+    start = pd.Timestamp(int(year), int(month), 1)
+    end = start + pd.offsets.MonthBegin(1)
+    if USE_SQLITE:
+        df0 = sqlite_backend.read_events_between(start, end)
+        meta = read_meta()
+    else:
+        part = columnar.read_partition(EVENTS_SNAPSHOT_FILE, EXCEL_FILE, _month_key(year, month))
+        if part is None:
+            # No current snapshot: one full parse publishes it for next time
+            return _month_slice(event_store.view(_read_events), start, end)
+        df0, meta = part
+    df0 = _normalize_events(df0)
+    df0.attrs["version"] = _events_version(meta)
+    return df0
+
+def load_month_events(year, month):
+    """Return the events dated in one calendar month.
+
+    Calendar views need one month at a time. If this process already holds
+    the full frame, the month is a slice of it; otherwise only that month's
+    partition of the snapshot (or a Date range query on SQLite) is read.
+    """
+    ensure_workbook()
+    start = pd.Timestamp(int(year), int(month), 1)
+    end = start + pd.offsets.MonthBegin(1)
+    return event_store.view_part(
+        _month_key(year, month),
+        lambda: _read_month(year, month),
+        lambda full: _month_slice(full, start, end),
+    )
+
+def load_archived_events(date_from, date_to):
+    """Return archived events dated date_from..date_to (inclusive days)."""
+    start = pd.Timestamp(date_from)
+    end = pd.Timestamp(date_to) + pd.Timedelta(days=1)
+    def read_range():
+        df0 = archive.read_archive(start, end)
+        return _normalize_events(df0 if len(df0) else pd.DataFrame(columns=EVENT_COLUMNS))
+    return archive_store.view_part((start, end), read_range, lambda full: full)
+
+def archive_events(cutoff=None, user_email=""):
+    """Move events dated before cutoff into the compressed archive.
+
+    cutoff defaults to ARCHIVE_AFTER_DAYS before today. Undated events are
+    never archived. Returns (ok, message).
+    """
+    if not columnar.HAVE_ARROW:
+        return False, "Archiving needs pyarrow."
+    if cutoff is None:
+        cutoff = pd.Timestamp.now().normalize() - pd.Timedelta(days=ARCHIVE_AFTER_DAYS)
+    cutoff = pd.Timestamp(cutoff)
+    ensure_workbook()
+    with workbook_lock.exclusive():
+        live = event_store.view(_read_events)
+        old = live[live["Date"] < cutoff]
+        if len(old):
+            # Archive before deleting: an interrupted run leaves rows in both
+            # places (filtered out on read), never in neither
+            archive.add_to_archive(_stored_events(old))
+            apply_event_changes(deletes=old.index.tolist())
+        previous = pd.to_datetime(read_meta().get("archived_before"), errors="coerce")
+        if pd.isna(previous) or cutoff > previous:
+            write_meta(archived_before=cutoff.strftime("%Y-%m-%d"))
+    if len(old):
+        append_audit(user_email, "Archived Events", f"{len(old)} event(s) before {cutoff:%Y-%m-%d}")
+    return True, f"Archived {len(old)} event(s) dated before {cutoff:%Y-%m-%d}."
+
+def _parse_events_sheet():
+    """Parse the Events sheet and the Meta dict from the workbook, and return
+    them with the snapshot key of the bytes parsed."""
+    started = time.perf_counter()
+    # Parse the exact bytes that were hashed, so the snapshot key cannot
+    # describe a different version of the file than the frame stored with it
+    with open(EXCEL_FILE, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    with pd.ExcelFile(BytesIO(data), engine="openpyxl") as xl:
+        sheets = xl.sheet_names
+        if EVENTS_SHEET in sheets:
+            df0 = xl.parse(EVENTS_SHEET)
+        else:
+            # Older workbooks: the next save writes this data as the Events sheet
+            fallback = next((s for s in sheets if "event" in s.lower()), sheets[0])
+            df0 = xl.parse(fallback)
+        meta = _meta_dict(xl.parse(META_SHEET)) if META_SHEET in sheets else {}
+    logging.info(f"Parsed events from workbook in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return df0, meta, columnar.source_key(st, data)
+
+def _diff_events(base, df0):
+    """Return (inserts, updates, deletes) that turn base into df0, by Event ID."""
+    inserts = df0[~df0.index.isin(base.index)]
+    deletes = base.index[~base.index.isin(df0.index)].tolist()
+    common = df0.index[df0.index.isin(base.index)]
+    cols = [c for c in df0.columns if c != EVENT_ID and c not in DERIVED_EVENT_COLUMNS]
+    old = base.reindex(index=common, columns=cols).astype(object)
+    new = df0.loc[common, cols].astype(object)
+    differs = ~((old == new) | (old.isna() & new.isna()))
+    updates = {}
+    for event_id, col in differs.stack().loc[lambda s: s].index:
+        updates.setdefault(event_id, {})[col] = new.at[event_id, col]
+    return (inserts if len(inserts) else None), updates, deletes
 
 def save_events(df0):
-    max_retries = 3
-    lock_file = f"{EXCEL_FILE}.lock"
-    for attempt in range(max_retries):
+    """Save a whole events frame, overwriting the stored events. Edits go
+    through apply_event_changes, which checks for conflicting saves."""
+    df0 = _stored_events(df0)
+    cols = df0.columns.tolist()
+    if "Title" in cols:
+        cols.remove("Title")
+        df0 = df0[["Title"] + cols]
+    try:
+        with workbook_lock.exclusive():
+            try:
+                current = event_store.view(_read_events)
+                version, meta = _stamp_events(read_meta(), None)
+                if USE_SQLITE:
+                    sqlite_backend.write_tables({EVENTS_SHEET: df0, META_SHEET: _meta_frame(meta)})
+                else:
+                    _write_workbook_sheets({
+                        EVENTS_SHEET: _stored_events(_normalize_events(df0.copy(deep=False))),
+                        META_SHEET: _meta_frame(meta),
+                    })
+                inserts, updates, deletes = _diff_events(current, _normalize_events(df0.copy(deep=False)))
+                # Journalled even when nothing differs: the version moved
+                _journal_changes(current, _batch_changes(current, inserts, updates, deletes), version)
+            finally:
+                event_store.invalidate()
+        return True
+    except PermissionError:
+        return False
+
+def _new_events_frame(rows):
+    """Build a frame of new events, giving each row without one an Event ID."""
+    new_df = pd.DataFrame(rows).reset_index(drop=True)
+    if EVENT_ID not in new_df.columns:
+        new_df[EVENT_ID] = None
+    missing = new_df[EVENT_ID].isna() | (new_df[EVENT_ID].astype(str).str.strip() == "")
+    new_df.loc[missing, EVENT_ID] = [new_event_id() for _ in range(int(missing.sum()))]
+    return new_df
+
+def _apply_to_frame(df0, inserts, updates, deletes):
+    """Apply a batch to a normalized frame and return the new frame.
+
+    Only the changed rows are converted; the rest are carried over as they
+    are, so the cost is a copy of the frame rather than a reload of it.
+    """
+    # Never write through to the caller's frame: it is the "before" image
+    df0 = df0.copy(deep=False)
+    if deletes:
+        df0 = df0.drop(index=list(deletes), errors="ignore")
+    moved = False
+    if updates:
+        positions = df0.index.get_indexer(list(updates))
+        for pos, (event_id, changes) in zip(positions, updates.items()):
+            if pos < 0:
+                logging.warning(f"Update skipped: event {event_id} no longer exists")
+                continue
+            for col, value in changes.items():
+                if col not in df0.columns:
+                    df0[col] = None
+                if col == "Date":
+                    value = pd.Timestamp(value)
+                    df0.iat[pos, df0.columns.get_loc(DAY)] = value.normalize()
+                    moved = True
+                elif col == "Is Marked":
+                    value = _as_bool(value)
+                elif isinstance(df0[col].dtype, pd.CategoricalDtype) and not pd.isna(value) \
+                        and value not in df0[col].cat.categories:
+                    df0[col] = df0[col].cat.add_categories([value])
+                df0.iat[pos, df0.columns.get_loc(col)] = value
+    if moved:
+        df0 = _sort_by_date(df0)
+    if inserts is not None and len(inserts):
+        new = _normalize_events(inserts.copy())
+        if (df0.index.get_indexer(new.index) >= 0).any():
+            # An ID already taken: the full pass gives the new row a fresh one
+            return _normalize_events(pd.concat([df0, new]))
+        df0 = _insert_sorted(df0, new)
+    return df0
+
+def _insert_sorted(df0, new):
+    """df0 with the rows of new (both normalized) placed in Date order,
+    after any rows of the same Date, without sorting df0 again."""
+    for col in new.columns.difference(df0.columns):
+        df0[col] = None
+    new = new.reindex(columns=df0.columns)
+    # Give the new rows the column types of df0, so concatenating them does
+    # not turn a whole column into objects
+    for col in df0.columns:
+        dtype = df0[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            missing = pd.Index(new[col].dropna().unique()).difference(dtype.categories)
+            if len(missing):
+                df0[col] = df0[col].cat.add_categories(missing)
+                dtype = df0[col].dtype
         try:
-            cols = df0.columns.tolist()
-            if "Title" in cols:
-                cols.remove("Title")
-                df0 = df0[["Title"] + cols]
-            with open(lock_file, "w") as lock:
-                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
-                try:
-                    with pd.ExcelWriter(EXCEL_FILE, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-                        df0.to_excel(writer, sheet_name=EVENTS_SHEET, index=False)
-                finally:
-                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
-            return True
-        except PermissionError:
-            if attempt < max_retries-1:
-                time.sleep(1); continue
-            return False
-    return False
+            new[col] = new[col].astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    dates = df0["Date"]
+    dated = int(dates.notna().sum())
+    positions = dates.iloc[:dated].searchsorted(new["Date"], side="right")
+    positions = np.where(new["Date"].isna(), len(df0), positions)
+    order = np.insert(np.arange(len(df0)), positions, np.arange(len(df0), len(df0) + len(new)))
+    return pd.concat([df0, new]).take(order)
 
-def create_backup(user_email=""):
-    """Create a timestamped backup of the Excel file."""
-    if not os.path.exists(EXCEL_FILE):
-        return False, "No data file exists to backup."
+def _plain(value):
+    """A JSON-friendly copy of one cell value."""
+    if isinstance(value, (list, dict)):
+        return value
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value.item() if isinstance(value, np.generic) else value
+
+def _plain_row(row):
+    return {col: _plain(value) for col, value in row.items() if col not in DERIVED_EVENT_COLUMNS}
+
+def _batch_changes(current, inserts, updates, deletes):
+    """Return the journal changes of a batch, with before images taken from
+    current. Updates and deletes of events that do not exist are left out."""
+    changes = []
+    if inserts is not None:
+        for row in inserts.to_dict("records"):
+            changes.append({"op": "insert", "id": row[EVENT_ID], "after": _plain_row(row)})
+    for event_id, values in updates.items():
+        if event_id in current.index:
+            before = current.loc[event_id]
+            changes.append({
+                "op": "update", "id": event_id,
+                "before": {c: _plain(before.get(c)) for c in values},
+                "after": {c: _plain(v) for c, v in values.items()},
+            })
+    for event_id in deletes:
+        if event_id in current.index:
+            changes.append({"op": "delete", "id": event_id, "before": _plain_row(current.loc[event_id])})
+    return changes
+
+def _journal_changes(current, changes, version, user="", undoes=None):
+    """Record one committed batch. Called under the write lock right after
+    the batch was written, so every version stamp has its journal entry."""
+    # Attribute the batch to whoever the rows say modified them
+    modified_by = [c["after"].get("Modified By") for c in changes if "after" in c]
+    entry = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "user": next((u for u in modified_by if u), user) or "",
+        "base_version": current.attrs.get("version"),
+        "version": version,
+        "changes": changes,
+    }
+    if undoes is not None:
+        entry["undoes"] = undoes
+    journal.append(entry)
+
+def block_index():
+    """The BlockIndex of the current events' marks, shared by all sessions."""
+    ensure_workbook()
+    return event_store.derived("blocks", _read_events, indexes.BlockIndex.from_frame)
+
+def trainer_index():
+    """The TrainerIndex of the current events, shared by all sessions."""
+    ensure_workbook()
+    return event_store.derived("trainers", _read_events, indexes.TrainerIndex.from_frame)
+
+def trainer_mask(frame, trainer):
+    """Boolean array: which rows of frame list trainer. Uses the shared
+    TrainerIndex when one is kept for frame's version, but never loads the
+    full events to build one (calendars only hold a month)."""
+    index = event_store.kept("trainers", frame.attrs.get("version"))
+    if index is None:
+        return indexes.lists_trainer(frame["Trainer Calendar"], trainer)
+    return index.mask(frame, trainer)
+
+def bitmap_index():
+    """The BitmapIndex of the current events over BITMAP_COLUMNS and trainers."""
+    ensure_workbook()
+    return event_store.derived(
+        "bitmaps", _read_events, lambda df0: indexes.BitmapIndex.from_frame(df0, BITMAP_COLUMNS)
+    )
+
+# Free-text columns the list tabs search, Client first
+SEARCH_COLUMNS = ["Client", "Course/Description", "Notes"]
+
+def search_index():
+    """The TextIndex of the current events over SEARCH_COLUMNS."""
+    ensure_workbook()
+    return event_store.derived(
+        "search", _read_events, lambda df0: indexes.TextIndex.from_frame(df0, SEARCH_COLUMNS)
+    )
+
+def search_events(df0, query, columns=("Client",)):
+    """Rows of df0 containing query (ignoring case) in any of columns,
+    ordered by date. An empty query returns df0 unchanged."""
+    if not query:
+        return df0
+    hit = search_index().mask(df0, query, list(columns))
+    return df0[hit].sort_values("Date", kind="stable")
+
+def _wanted(values):
+    # "All" (or None) in a filter means any value, as in the list tabs
+    return {col: value for col, value in values.items() if value is not None and value != "All"}
+
+def select_events(df0, date_from=None, date_to=None, trainer=None, include_archived=False, **values):
+    """Rows of df0 matching every filter, copied out once.
+
+    values maps a column of BITMAP_COLUMNS to the value wanted (pass
+    columns with spaces as **{"Is Marked": True}); trainer must be listed
+    in Trainer Calendar; date_from/date_to bound the day inclusively. A
+    value of None or "All" filters nothing. When df0 is the current frame
+    the filters are ANDed bitmaps (the date range is a slice of the
+    Date-sorted rows) and only the surviving rows are materialized; other
+    frames are filtered with masks. include_archived adds matching
+    archived events when a date range is given.
+    """
+    values = _wanted(values)
+    trainer = None if trainer == "All" else trainer
+    index = bitmap_index()
+    if index.matches(df0) and all(col in index.bitmaps for col in values):
+        rows = None
+        if date_from is not None and date_to is not None:
+            rows = (df0[DAY].searchsorted(pd.Timestamp(date_from), side="left"),
+                    df0[DAY].searchsorted(pd.Timestamp(date_to), side="right"))
+        result = df0.iloc[index.select(values, trainer, rows)]
+    else:
+        result = _mask_select(df0, date_from, date_to, trainer, values)
+    if include_archived and date_from is not None and date_to is not None:
+        archived = load_archived_events(date_from, date_to)
+        # A row can be in both if an archive run stopped before its delete
+        archived = _mask_select(archived[~archived.index.isin(df0.index)], None, None, trainer, values)
+        if len(archived):
+            result = pd.concat([archived, result])
+    return result
+
+def _mask_select(df0, date_from, date_to, trainer, values):
+    mask = np.ones(len(df0), dtype=bool)
+    if date_from is not None and date_to is not None:
+        mask &= ((df0[DAY] >= pd.Timestamp(date_from)) & (df0[DAY] <= pd.Timestamp(date_to))).to_numpy()
+    if trainer is not None:
+        mask &= trainer_index().mask(df0, trainer)
+    for col, value in values.items():
+        mask &= (df0[col] == value).to_numpy(dtype=bool)
+    return df0[mask]
+
+def _advance_indexes(current, updated, inserts, updates, deletes, version):
+    """Carry the kept indexes from current to updated by the changed rows
+    only. Positional indexes are dropped when rows were added, removed or
+    reordered, and rebuilt by the next reader outside the write lock."""
+    before_ids = current.index.intersection(list(updates) + list(deletes))
+    after_ids = updated.index.intersection(
+        list(updates) + ([] if inserts is None else inserts[EVENT_ID].tolist())
+    )
+    removed, added = current.loc[before_ids], updated.loc[after_ids]
+    event_store.advance("blocks", current.attrs.get("version"), version,
+                        lambda index: index.updated(removed, added))
+    for name in ("trainers", "bitmaps", "search"):
+        event_store.advance(name, current.attrs.get("version"), version,
+                            lambda index: index.updated(current, updated, updates, version))
+
+def apply_event_changes(inserts=None, updates=None, deletes=None, expected_version=None, user="", undoes=None):
+    """Apply row-level changes to the Events sheet.
+
+    Args:
+        inserts: list of row dicts (or a DataFrame) to append. Rows keep an
+                 existing Event ID; rows without one get a new ID.
+        updates: {event_id: {column: value}} for existing events
+        deletes: iterable of Event IDs to remove
+        expected_version: version stamp of the frame the changes were made
+                 from. If given, raises ConflictError when any updated or
+                 deleted event was changed by a save after that version.
+        user: recorded in the change journal when the rows themselves do
+                 not carry a "Modified By" (e.g. deletes)
+        undoes: version of the batch this one undoes (see undo_change)
+
+    The SQLite backend touches only the affected rows. An xlsx sheet cannot
+    be rewritten partially, so the Excel backend writes the sheet once from
+    the shared frame, but neither backend reparses the stored events.
+    A batch that only refers to events that no longer exist writes nothing
+    and does not move the version. Returns the Event IDs of the inserted rows.
+    """
+    inserts = _new_events_frame(inserts) if inserts is not None and len(inserts) else None
+    if inserts is not None:
+        inserts = _stored_events(inserts)
+    updates = {
+        event_id: {c: v for c, v in changes.items() if c not in DERIVED_EVENT_COLUMNS}
+        for event_id, changes in (updates or {}).items()
+    }
+    deletes = list(deletes or [])
+    ensure_workbook()
+    with workbook_lock.exclusive():
+        published = False
+        meta = read_meta()
+        touched = set(updates) | set(deletes)
+        _check_version(expected_version, meta, touched)
+        current = event_store.view(_read_events)
+        changes = _batch_changes(current, inserts, updates, deletes)
+        if not changes:
+            return []
+        updated = _apply_to_frame(current, inserts, updates, deletes)
+        # New rows have fresh IDs nobody else can hold, so only record the rest
+        version, meta = _stamp_events(meta, touched)
+        updated.attrs["version"] = version
+        try:
+            if USE_SQLITE:
+                sqlite_backend.apply_event_changes(
+                    inserts, updates, deletes, tables={META_SHEET: _meta_frame(meta)}
+                )
+            else:
+                published = _write_workbook_sheets(
+                    {EVENTS_SHEET: _stored_events(updated), META_SHEET: _meta_frame(meta)}
+                )
+        except Exception:
+            event_store.invalidate()
+            raise
+        _journal_changes(current, changes, version, user, undoes)
+        # Map the snapshot just published instead of keeping a private copy
+        event_store.replace(_read_events() if published else updated)
+    # Outside the lock: a concurrent write only makes advance() drop an index
+    _advance_indexes(current, updated, inserts, updates, deletes, version)
+    return [] if inserts is None else inserts[EVENT_ID].tolist()
+
+def get_event(event_id):
+    """Return one event as a Series by Event ID (hash lookup), or None."""
+    df0 = load_events()
+    if event_id not in df0.index:
+        return None
+    return df0.loc[event_id]
+
+def insert_events(rows):
+    """Add new events, each under a fresh Event ID. Returns the new IDs."""
+    new_df = pd.DataFrame(rows).drop(columns=[EVENT_ID], errors="ignore")
+    return apply_event_changes(inserts=new_df)
+
+def update_events(updates, expected_version=None, user=""):
+    """Apply {event_id: {column: value}} to existing events."""
+    apply_event_changes(updates=updates, expected_version=expected_version, user=user)
+
+def delete_events(event_ids, expected_version=None, user=""):
+    """Remove the events with the given Event IDs."""
+    apply_event_changes(deletes=event_ids, expected_version=expected_version, user=user)
+
+def _undone_versions(entries):
+    """Versions of the batches in entries that an undo still in effect undid."""
+    undone = set()
+    # Newest first, so an undo that was itself undone does not count
+    for entry in reversed(entries):
+        if entry.get("undoes") is not None and entry.get("version") not in undone:
+            undone.add(entry["undoes"])
+    return undone
+
+def recent_changes(limit=20):
+    """Return the newest journal batches that have not been undone, newest
+    first, each summarised as {version, ts, user, inserts, updates, deletes}."""
+    entries = journal.read_entries()
+    undone = _undone_versions(entries)
+    batches = []
+    for entry in reversed(entries):
+        if len(batches) >= limit:
+            break
+        if not entry.get("changes") or entry["version"] in undone:
+            continue
+        ops = [c["op"] for c in entry["changes"]]
+        batches.append({
+            "version": entry["version"], "ts": entry["ts"], "user": entry["user"],
+            "inserts": ops.count("insert"), "updates": ops.count("update"), "deletes": ops.count("delete"),
+        })
+    return batches
+
+def _inverse(changes, present):
+    """Return (inserts, updates, deletes) that undo a batch's changes.
+
+    present is the set of Event IDs that currently exist.
+    """
+    inserts, updates, deletes = [], {}, []
+    for change in reversed(changes):
+        if change["op"] == "insert" and change["id"] in present:
+            deletes.append(change["id"])
+        elif change["op"] == "update" and change["id"] in present:
+            updates.setdefault(change["id"], {}).update(change["before"])
+        elif change["op"] == "delete" and change["id"] not in present:
+            inserts.append(change["before"])
+    return inserts, updates, deletes
 
-    # Create backups directory if it doesn't exist
-    if not os.path.exists(BACKUP_DIR):
-        os.makedirs(BACKUP_DIR)
+def undo_change(version, user_email=""):
+    """Undo the journal batch that produced version, keeping later changes.
 
-    # Generate backup filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_name = os.path.splitext(EXCEL_FILE)[0]
-    backup_filename = f"{base_name}_backup_{timestamp}.xlsx"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
+    Raises ConflictError if a later save changed any of the same events, and
+    ValueError if the batch is no longer in the journal, was already undone
+    or left nothing to undo.
+    """
+    entries = journal.read_entries()
+    entry = next((e for e in entries if e.get("version") == version and e.get("changes")), None)
+    if entry is None:
+        raise ValueError(f"Change {version} is no longer in the journal.")
+    if version in _undone_versions(entries):
+        raise ValueError(f"Change {version} was already undone.")
+    present = set(load_events().index)
+    inserts, updates, deletes = _inverse(entry["changes"], present)
+    if not (inserts or updates or deletes):
+        raise ValueError(f"Nothing of change {version} is left to undo.")
+    apply_event_changes(inserts or None, updates, deletes, expected_version=version, user=user_email, undoes=version)
+    append_audit(user_email, "Undid Change", f"version {version} ({len(entry['changes'])} row(s))")
+
+def events_as_of(when):
+    """Rebuild the events as they were at datetime when, by undoing every
+    journalled batch committed after it, newest first.
+
+    Raises ValueError if the journal cannot reach that far back: it was
+    compacted past it, the data was restored or imported since, or a change
+    was made without going through the journal.
+    """
+    when = pd.Timestamp(when).isoformat()
+    entries = journal.read_entries()
+    start = journal.covers_from(entries)
+    if start is None:
+        raise ValueError("No changes have been journalled yet.")
+    if when < start:
+        raise ValueError(f"The journal only goes back to {start.replace('T', ' ')}.")
+    df0 = load_events()
+    version = df0.attrs.get("version")
+    for entry in reversed(entries):
+        if entry["ts"] <= when or entry.get("start"):
+            break
+        if entry.get("reset"):
+            raise ValueError(f"The data was replaced by a restore or import at {entry['ts']}; restore a backup instead.")
+        if entry["version"] != version:
+            raise ValueError(f"The journal has a gap before {entry['ts']}; restore a backup instead.")
+        inserts, updates, deletes = _inverse(entry["changes"], set(df0.index))
+        df0 = _apply_to_frame(df0, _new_events_frame(inserts) if inserts else None, updates, deletes)
+        version = entry["base_version"]
+    return df0
+
+def restore_events_to(when, user_email=""):
+    """Put the events back the way they were at datetime when.
+
+    Applied as one ordinary batch, so it is journalled and can itself be
+    undone. Returns (ok, message).
+    """
+    try:
+        current = load_events()
+        target = events_as_of(when)
+        inserts, updates, deletes = _diff_events(current, target)
+        apply_event_changes(inserts, updates, deletes, expected_version=current.attrs.get("version"), user=user_email)
+    except (ValueError, ConflictError) as e:
+        return False, str(e)
+    count = (0 if inserts is None else len(inserts)) + len(updates) + len(deletes)
+    append_audit(user_email, "Restored Events", f"to {pd.Timestamp(when):%Y-%m-%d %H:%M} ({count} row(s))")
+    return True, f"Restored events to {pd.Timestamp(when):%Y-%m-%d %H:%M} ({count} row(s) changed)."
+
+def compact_journal(keep_days=JOURNAL_KEEP_DAYS):
+    """Drop journal batches older than keep_days. Their changes are already
+    in the data file; only undo and rewind past them are lost. Returns the
+    number of batches dropped."""
+    cutoff = (datetime.now() - pd.Timedelta(days=keep_days)).isoformat(timespec="seconds")
+    with workbook_lock.exclusive():
+        entries = [e for e in journal.read_entries() if not e.get("start")]
+        kept = [e for e in entries if e["ts"] >= cutoff]
+        if len(kept) < len(entries):
+            journal.replace_entries(kept, cutoff)
+    return len(entries) - len(kept)
+
+def assign_event_ids():
+    """Persist an Event ID for every stored event that does not have one."""
+    save_events(load_events())
+
+def export_workbook():
+    """Return the current data as xlsx bytes in the workbook layout."""
+    ensure_workbook()
+    if USE_SQLITE:
+        buffer = BytesIO()
+        sqlite_backend.export_to_excel(buffer)
+        return buffer.getvalue()
+    with open(EXCEL_FILE, "rb") as f:
+        return f.read()
+
+def _restamp_events(previous_version):
+    """Move the events version past previous_version after a wholesale swap.
+
+    A restored file carries its own, possibly older, version stamp; reusing
+    those numbers would let saves based on pre-restore views pass the check.
+    """
+    with workbook_lock.exclusive():
+        meta = read_meta()
+        meta["events_version"] = max(previous_version, _events_version(meta))
+        version, meta = _stamp_events(meta, None)
+        write_sheet(META_SHEET, _meta_frame(meta))
+        # Rewinding the journal cannot cross a wholesale swap
+        journal.append({"ts": datetime.now().isoformat(timespec="seconds"), "user": "",
+                        "reset": True, "base_version": previous_version, "version": version, "changes": []})
+    event_store.invalidate()
+
+def _reset_bootstrap():
+    """Make the next rerun re-check the schema of a workbook swapped in from outside."""
+    from .bootstrap import reset_bootstrap
+    reset_bootstrap()
+
+def _archive_rows():
+    """The archived events as rows, header first ([] if there are none),
+    or None when the archive cannot be read here (no pyarrow)."""
+    if not columnar.HAVE_ARROW:
+        return None
+    df0 = archive.read_archive()
+    if not len(df0):
+        return []
+    df0 = df0.astype(object).where(df0.notna(), None)
+    return [list(df0.columns)] + [list(row) for row in df0.itertuples(index=False, name=None)]
+
+def _restore_archive(rows):
+    # Caller holds workbook_lock exclusively
+    df0 = pd.DataFrame(rows[1:], columns=rows[0]) if rows else pd.DataFrame()
+    for col in EVENT_CATEGORY_COLUMNS:
+        if col in df0.columns:
+            df0[col] = df0[col].astype("category")
+    archive.replace_archive(df0)
+    archive_store.invalidate()
+
+def create_backup(user_email=""):
+    """Create a timestamped, deduplicated backup of the data and the events
+    archive (see core.backups).
+
+    Only the sheets and Events or archive months that changed since an
+    earlier backup take new space. Old backups are pruned in the background
+    afterwards.
+    """
+    if not os.path.exists(SQLITE_FILE if USE_SQLITE else EXCEL_FILE):
+        return False, "No data file exists to backup."
 
     try:
-        shutil.copy2(EXCEL_FILE, backup_path)
+        source = BytesIO()
+        # Data first, then the archive: an archive run adds events to the
+        # archive before deleting them, so a concurrent one can leave events
+        # in both copies but never in neither
+        if USE_SQLITE:
+            sqlite_backend.export_to_excel(source)
+        else:
+            with open(EXCEL_FILE, "rb") as f:
+                shutil.copyfileobj(f, source)
+        archive_rows = _archive_rows()
+        source.seek(0)
+        backup_filename = backup_store.create(source, EVENTS_SHEET, archive_rows=archive_rows)
         # Log the backup action
         append_audit(user_email, "Created Backup", backup_filename)
+        backup_store.prune_in_background(BACKUP_KEEP_LAST, BACKUP_KEEP_DAILY_DAYS, BACKUP_KEEP_WEEKLY_WEEKS)
         return True, backup_filename
     except Exception as e:
         return False, str(e)
 
-def list_backups():
-    """List all available backup files sorted by date (newest first)."""
-    if not os.path.exists(BACKUP_DIR):
-        return []
+def _is_legacy_backup(filename):
+    return backup_store.is_legacy(filename)
 
-    backups = []
-    for filename in os.listdir(BACKUP_DIR):
-        if filename.endswith(".xlsx") and "_backup_" in filename:
-            filepath = os.path.join(BACKUP_DIR, filename)
-            modified_time = os.path.getmtime(filepath)
-            size_kb = os.path.getsize(filepath) / 1024
-            backups.append({
-                "filename": filename,
-                "filepath": filepath,
-                "created": datetime.fromtimestamp(modified_time).strftime("%Y-%m-%d %H:%M:%S"),
-                "size_kb": round(size_kb, 1)
-            })
+def count_backups():
+    return len(backup_store.catalog())
 
-    # Sort by created date, newest first
-    backups.sort(key=lambda x: x["created"], reverse=True)
-    return backups
+def list_backups(offset=0, limit=None):
+    """List backups newest first, optionally one page of them.
+
+    Read from the backup catalog, which only changes when a backup is
+    created or deleted, so listing does not touch the backup files.
+    """
+    entries = backup_store.catalog()
+    entries = entries[offset:] if limit is None else entries[offset:offset + limit]
+    return [{
+        "filename": e["filename"],
+        "download_name": os.path.splitext(e["filename"])[0] + ".xlsx",
+        "created": e["created"].replace("T", " "),
+        "size_kb": round(e["size"] / 1024, 1),
+        "added_kb": round(e["added"] / 1024, 1),
+        "checksum": e["checksum"],
+    } for e in entries]
+
+def backup_file(filename):
+    """Return the workbook saved by a backup as bytes, for downloading."""
+    if _is_legacy_backup(filename):
+        with open(os.path.join(BACKUP_DIR, filename), "rb") as f:
+            return f.read()
+    buffer = BytesIO()
+    backup_store.build(filename, buffer)
+    return buffer.getvalue()
 
 def delete_backup(filename):
-    """Delete a specific backup file."""
-    filepath = os.path.join(BACKUP_DIR, filename)
-    if os.path.exists(filepath):
-        os.remove(filepath)
-        return True
-    return False
+    """Delete a specific backup."""
+    return backup_store.delete(filename)
 
 def restore_backup(filename, user_email=""):
-    """Restore data from a backup file."""
+    """Restore data from a backup."""
     filepath = os.path.join(BACKUP_DIR, filename)
     if not os.path.exists(filepath):
         return False, "Backup file not found."
+    legacy = _is_legacy_backup(filename)
 
     try:
         # Create a backup of current data before restoring
         create_backup(user_email)
+        previous_version = _events_version(read_meta())
+
+        # Backups made before the archive was included leave it as it is
+        archive_rows = None if legacy else backup_store.archive_rows(filename)
 
-        # Copy the backup file to the main data file
-        shutil.copy2(filepath, EXCEL_FILE)
+        # Rebuild the backed-up workbook as the main data file
+        if USE_SQLITE:
+            if legacy:
+                sqlite_backend.import_from_excel(filepath)
+            else:
+                buffer = BytesIO()
+                backup_store.build(filename, buffer)
+                buffer.seek(0)
+                sqlite_backend.import_from_excel(buffer)
+        else:
+            with workbook_lock.exclusive(), new_snapshot(EXCEL_FILE) as tmp:
+                if legacy:
+                    shutil.copy2(filepath, tmp)
+                else:
+                    backup_store.build(filename, tmp)
+        if archive_rows is not None:
+            with workbook_lock.exclusive():
+                _restore_archive(archive_rows)
+        # copy2 keeps the backup's mtime, so the signature check alone could miss it
+        event_store.invalidate()
+        _restamp_events(previous_version)
+        _reset_bootstrap()
 
         # Log the restore action
         append_audit(user_email, "Restored Backup", filename)
@@ -358,39 +1317,94 @@ def restore_backup(filename, user_email=""):
     except Exception as e:
         return False, str(e)
 
-def import_backup(uploaded_file, user_email=""):
-    """Import a backup from an uploaded file."""
+# Uploads are copied to disk in blocks of this size, never whole
+IMPORT_CHUNK_SIZE = 1024 * 1024
+IMPORT_MAX_BYTES = 50 * 1024 * 1024
+# Columns an imported workbook must have; missing optional ones are added on load
+IMPORT_REQUIRED_COLUMNS = {
+    EVENTS_SHEET: ["Title", "Date"],
+    "Users": ["Email", "Role"],
+}
+
+def _spool_upload(uploaded_file, path):
+    """Copy an uploaded file to path block by block; returns its size."""
+    uploaded_file.seek(0)
+    size = 0
+    with open(path, "wb") as f:
+        while True:
+            block = uploaded_file.read(IMPORT_CHUNK_SIZE)
+            if not block:
+                break
+            size += len(block)
+            if size > IMPORT_MAX_BYTES:
+                raise ValueError("File too large. Maximum size is 50MB.")
+            f.write(block)
+    return size
+
+def _check_import(path):
+    """Validate a spooled workbook row by row; returns {sheet: data row count}.
+
+    Raises ValueError describing the first problem found.
+    """
     try:
-        # Validate file size (max 50MB)
-        file_size = len(uploaded_file.getbuffer())
-        if file_size > 50 * 1024 * 1024:
-            return False, "File too large. Maximum size is 50MB."
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Invalid Excel file: {e}") from e
+    try:
+        missing = [name for name in IMPORT_REQUIRED_COLUMNS if name not in wb.sheetnames]
+        if missing:
+            raise ValueError(f"Invalid backup file. Missing required sheets: {', '.join(missing)}")
+        counts = {}
+        for name in wb.sheetnames:
+            rows = wb[name].iter_rows(values_only=True)
+            header = [str(v) for v in next(rows, ()) if v is not None]
+            absent = [c for c in IMPORT_REQUIRED_COLUMNS.get(name, []) if c not in header]
+            if absent:
+                raise ValueError(f"Invalid backup file. Sheet '{name}' is missing columns: {', '.join(absent)}")
+            counts[name] = sum(1 for row in rows if any(v is not None for v in row))
+        if not counts["Users"]:
+            raise ValueError("Invalid backup file. The Users sheet has no users.")
+        return counts
+    finally:
+        wb.close()
 
-        # Validate it's a valid Excel file by trying to read it
-        try:
-            uploaded_file.seek(0)
-            test_wb = load_workbook(uploaded_file, read_only=True)
-            sheet_names = test_wb.sheetnames
-            test_wb.close()
-            uploaded_file.seek(0)
-
-            # Check for expected sheets
-            required_sheets = [EVENTS_SHEET, "Users"]
-            missing = [s for s in required_sheets if s not in sheet_names]
-            if missing:
-                return False, f"Invalid backup file. Missing required sheets: {', '.join(missing)}"
-        except Exception as e:
-            return False, f"Invalid Excel file: {str(e)}"
+def import_backup(uploaded_file, user_email=""):
+    """Import a backup from an uploaded file.
+
+    The upload is spooled to a temp file next to the data file in blocks and
+    validated from there with a streaming reader, so memory use does not grow
+    with the file. The validated file is then swapped in atomically.
+    """
+    directory = os.path.dirname(os.path.abspath(EXCEL_FILE))
+    fd, spool = tempfile.mkstemp(prefix=".import.", suffix=".xlsx", dir=directory)
+    os.close(fd)
+    try:
+        _spool_upload(uploaded_file, spool)
+        counts = _check_import(spool)
 
         # Create a backup of current data before importing
         create_backup(user_email)
+        previous_version = _events_version(read_meta())
 
-        # Write the uploaded file to the main data file
-        with open(EXCEL_FILE, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # Swap the uploaded file in as the main data file
+        if USE_SQLITE:
+            sqlite_backend.import_from_excel(spool)
+        else:
+            with workbook_lock.exclusive(), new_snapshot(EXCEL_FILE) as tmp:
+                os.replace(spool, tmp)
+                if os.path.exists(EXCEL_FILE):
+                    shutil.copymode(EXCEL_FILE, tmp)
+                else:
+                    os.chmod(tmp, NEW_FILE_MODE)
+        event_store.invalidate()
+        _restamp_events(previous_version)
+        _reset_bootstrap()
 
         # Log the import action
-        append_audit(user_email, "Imported Backup", uploaded_file.name)
-        return True, f"Successfully imported {uploaded_file.name}"
+        append_audit(user_email, "Imported Backup", f"{uploaded_file.name} ({counts[EVENTS_SHEET]} events)")
+        return True, f"Successfully imported {uploaded_file.name} ({counts[EVENTS_SHEET]} events, {counts['Users']} users)"
     except Exception as e:
         return False, str(e)
+    finally:
+        if os.path.exists(spool):
+            os.remove(spool)
@@ -56,12 +56,21 @@ def generate_title(row):
 
     return str(base).strip()
 
-def trainer_matches(series, trainer):
-    pattern = rf"(^|,\s*){re.escape(trainer)}(\s*,|$)"
-    return series.fillna("").str.contains(pattern, regex=True)
+def index_by_day(df_all):
+    """Map each day to the row positions of its events, in one grouped pass.
 
-def get_events_for_day(df_all, date_obj):
-    return df_all[pd.to_datetime(df_all['Date']).dt.date == date_obj]
+    Build it once per rendered frame; get_events_for_day then only touches
+    the rows of the day it is asked for.
+    """
+    return df_all.groupby("Day", sort=False).indices
+
+def get_events_for_day(df_all, date_obj, day_index=None):
+    """Events of df_all on date_obj. day_index (from index_by_day(df_all))
+    turns the scan into a lookup."""
+    if day_index is None:
+        return df_all[df_all['Day'] == pd.Timestamp(date_obj)]
+    positions = day_index.get(pd.Timestamp(date_obj))
+    return df_all.iloc[positions] if positions is not None else df_all.iloc[:0]
 
 def marked_for_includes(marked_for_value, trainer):
     if pd.isna(marked_for_value):
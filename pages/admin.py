@@ -1,31 +1,33 @@
 import streamlit as st
 from datetime import datetime
-import pandas as pd
 from ui.event_forms import new_event_tab, manage_events_tab
 from ui.calendar_grid import calendar_grid
 from ui.day_details import day_details_panel
 from ui.mark_dates import mark_dates_tab
 from ui.settings_page import settings_tab
 from ui.shared import trainer_legend
+from core.storage import load_month_events, load_events
 
-def admin_page(df, user_email, settings):
+def admin_page(user_email, settings):
     (TRAINERS, TRAINER_COLORS, TYPES, STATUSES, SOURCES, MEDIUMS, LOCATIONS,
      DEFAULT_TYPE, DEFAULT_STATUS, DEFAULT_SOURCE, DEFAULT_MEDIUM, DEFAULT_LOCATION,
      RULE_ONLY_ADMIN_CAN_BLOCK, RULE_BLOCK_PREVENT_DUPLICATES,
      users_df, trainers_df, lists_df, rules_df, defaults_df, notif_df, EXCEL_FILE, refresh_pw_cb) = settings
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    # st.tabs runs every tab on each rerun; with a view switch only the
+    # chosen view runs, so the calendar never loads the full event history
+    view = st.radio("View", [
         "➕ New Event","🔍 Manage Events","📅 Calendar View","🚫 Mark Dates","⚙️ Settings"
-    ])
+    ], horizontal=True, label_visibility="collapsed", key="admin_view")
 
-    with tab1:
-        df = new_event_tab(df, user_email, TRAINERS, TYPES, STATUSES, SOURCES, MEDIUMS, LOCATIONS,
-                           DEFAULT_TYPE, DEFAULT_STATUS, DEFAULT_SOURCE, DEFAULT_MEDIUM, DEFAULT_LOCATION)
+    if view == "➕ New Event":
+        new_event_tab(user_email, TRAINERS, TYPES, STATUSES, SOURCES, MEDIUMS, LOCATIONS,
+                      DEFAULT_TYPE, DEFAULT_STATUS, DEFAULT_SOURCE, DEFAULT_MEDIUM, DEFAULT_LOCATION)
 
-    with tab2:
-        df = manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, MEDIUMS, TYPES, RULE_BLOCK_PREVENT_DUPLICATES)
+    elif view == "🔍 Manage Events":
+        manage_events_tab(load_events(), user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, MEDIUMS, TYPES, RULE_BLOCK_PREVENT_DUPLICATES)
 
-    with tab3:
+    elif view == "📅 Calendar View":
         st.header("📅 Calendar View")
         col1, col2 = st.columns([1,3])
         with col1:
@@ -39,14 +41,11 @@ def admin_page(df, user_email, settings):
         trainer_legend(TRAINERS, TRAINER_COLORS)
         st.divider()
 
-        month_events = df[
-            (pd.to_datetime(df["Date"]).dt.month==selected_month) &
-            (pd.to_datetime(df["Date"]).dt.year==selected_year)
-        ].copy()
+        month_events = load_month_events(selected_year, selected_month)
 
         calendar_grid(month_events, selected_year, selected_month, TRAINERS, TRAINER_COLORS, role_prefix="admin")
         st.divider()
-        df = day_details_panel(month_events, df, can_unmark=True, close_key="admin_close_day")
+        day_details_panel(month_events, user_email, can_unmark=True, close_key="admin_close_day")
 
         st.divider()
         st.subheader(f"📋 All Events in {datetime(2000,selected_month,1).strftime('%B')} {selected_year}")
@@ -65,10 +64,8 @@ def admin_page(df, user_email, settings):
         else:
             st.info("No events in this month.")
 
-    with tab4:
-        df = mark_dates_tab(df, user_email, TRAINERS, RULE_ONLY_ADMIN_CAN_BLOCK, "admin")
+    elif view == "🚫 Mark Dates":
+        mark_dates_tab(load_events(), user_email, TRAINERS, RULE_ONLY_ADMIN_CAN_BLOCK, "admin")
 
-    with tab5:
+    else:
         settings_tab(users_df, trainers_df, lists_df, rules_df, defaults_df, notif_df, EXCEL_FILE, refresh_pw_cb, user_email)
-
-    return df
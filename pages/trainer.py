@@ -2,10 +2,11 @@ import streamlit as st
 from datetime import datetime
 import pandas as pd
 import calendar
-from core.utils import trainer_matches, get_events_for_day, marked_for_includes
+from core.utils import get_events_for_day, index_by_day, marked_for_includes
+from core.storage import load_month_events, load_events, trainer_mask
 from ui.event_forms import trainer_events_list_tab
 
-def trainer_page(df, user_email, settings):
+def trainer_page(user_email, settings):
     # Trainers should only see their own information
     trainer_name = settings["trainer_name"]
     trainer_color = settings.get("trainer_color", "#ccc")  # Only their own color
@@ -14,29 +15,19 @@ def trainer_page(df, user_email, settings):
 
     st.info(f"🎓 Welcome {trainer_name}! This is your Event List.")
 
-    # Create tabs for different views
-    tab1, tab2 = st.tabs(["📅 Calendar View", "📋 My Events List"])
+    view = st.radio("View", ["📅 Calendar View", "📋 My Events List"],
+                    horizontal=True, label_visibility="collapsed", key="trainer_view")
 
-    with tab1:
-        _render_calendar_tab(df, trainer_name, trainer_color)
+    if view == "📅 Calendar View":
+        _render_calendar_tab(trainer_name, trainer_color)
+    else:
+        trainer_events_list_tab(load_events(), trainer_name, STATUSES, SOURCES)
 
-    with tab2:
-        trainer_events_list_tab(df, trainer_name, STATUSES, SOURCES)
 
-    return df
-
-
-def _render_calendar_tab(df, trainer_name, trainer_color):
+def _render_calendar_tab(trainer_name, trainer_color):
     """Render the calendar view tab for trainers."""
     st.header("📅 My Calendar")
 
-    trainer_events = df[trainer_matches(df["Trainer Calendar"], trainer_name)]
-    marked_events = df[
-        (df["Is Marked"]==True) &
-        (df["Marked For"].apply(lambda x: marked_for_includes(x, trainer_name)))
-    ]
-    df_my = pd.concat([trainer_events, marked_events], ignore_index=True)
-
     col1, col2 = st.columns([1,3])
     with col1:
         cy = datetime.now().year
@@ -53,12 +44,18 @@ def _render_calendar_tab(df, trainer_name, trainer_color):
     )
     st.divider()
 
-    month_events = df_my[
-        (pd.to_datetime(df_my["Date"]).dt.month==selected_month) &
-        (pd.to_datetime(df_my["Date"]).dt.year==selected_year)
-    ].copy()
+    month_all = load_month_events(selected_year, selected_month)
+    trainer_events = month_all[trainer_mask(month_all, trainer_name)]
+    marked_events = month_all[
+        month_all["Is Marked"] &
+        (month_all["Marked For"].apply(lambda x: marked_for_includes(x, trainer_name)).astype(bool))
+    ]
+    month_events = pd.concat([trainer_events, marked_events], ignore_index=True)
 
     cal = calendar.monthcalendar(selected_year, selected_month)
+    day_index = index_by_day(month_events)
+    all_marks = month_all[month_all["Is Marked"]]
+    marks_index = index_by_day(all_marks)
     days_of_week = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
     header_cols = st.columns(7)
     for i, dn in enumerate(days_of_week):
@@ -75,14 +72,11 @@ def _render_calendar_tab(df, trainer_name, trainer_color):
                                 unsafe_allow_html=True)
                 else:
                     day_date = datetime(selected_year,selected_month,day).date()
-                    day_events = get_events_for_day(month_events, day_date)
+                    day_events = get_events_for_day(month_events, day_date, day_index)
 
                     # check blocked for me
                     reason = None
-                    marks = df[
-                        (df["Is Marked"]==True) &
-                        (pd.to_datetime(df["Date"]).dt.date==day_date)
-                    ]
+                    marks = get_events_for_day(all_marks, day_date, marks_index)
                     for _,m in marks.iterrows():
                         if marked_for_includes(m.get("Marked For","All"), trainer_name):
                             reason = str(m.get("Course/Description","Blocked"))
@@ -123,8 +117,8 @@ def _render_calendar_tab(df, trainer_name, trainer_color):
         if len(day_all)==0:
             st.info("No events on this day.")
         else:
-            blocked_today = day_all[day_all.get("Is Marked", False)==True]
-            normal_today = day_all[day_all.get("Is Marked", False)!=True]
+            blocked_today = day_all[day_all["Is Marked"]]
+            normal_today = day_all[~day_all["Is Marked"]]
             for _, ev in blocked_today.iterrows():
                 with st.expander(f"🚫 BLOCKED: {ev.get('Course/Description','')}", expanded=True):
                     st.error("Blocked for you.")
@@ -1,12 +1,12 @@
 import streamlit as st
 from datetime import datetime
-import pandas as pd
 from ui.calendar_grid import calendar_grid
 from ui.day_details import day_details_panel
 from ui.shared import trainer_legend
 from ui.event_forms import viewer_events_list_tab
+from core.storage import load_month_events, load_events
 
-def viewer_page(df, user_email, settings):
+def viewer_page(user_email, settings):
     TRAINERS = settings["TRAINERS"]
     TRAINER_COLORS = settings["TRAINER_COLORS"]
     STATUSES = settings.get("STATUSES", [])
@@ -14,19 +14,17 @@ def viewer_page(df, user_email, settings):
 
     st.info("👁️ You have view-only access. You can view all events but cannot make changes.")
 
-    # Create tabs for different views
-    tab1, tab2 = st.tabs(["📅 Calendar View", "📋 Events List"])
+    # Only the chosen view runs: the calendar reads one month, the list the full history
+    view = st.radio("View", ["📅 Calendar View", "📋 Events List"],
+                    horizontal=True, label_visibility="collapsed", key="viewer_view")
 
-    with tab1:
-        _render_calendar_tab(df, TRAINERS, TRAINER_COLORS)
+    if view == "📅 Calendar View":
+        _render_calendar_tab(user_email, TRAINERS, TRAINER_COLORS)
+    else:
+        viewer_events_list_tab(load_events(), TRAINERS, STATUSES, SOURCES)
 
-    with tab2:
-        viewer_events_list_tab(df, TRAINERS, STATUSES, SOURCES)
 
-    return df
-
-
-def _render_calendar_tab(df, TRAINERS, TRAINER_COLORS):
+def _render_calendar_tab(user_email, TRAINERS, TRAINER_COLORS):
     """Render the calendar view tab for viewers."""
     st.header("📅 Calendar View (Read Only)")
 
@@ -42,11 +40,8 @@ def _render_calendar_tab(df, TRAINERS, TRAINER_COLORS):
     trainer_legend(TRAINERS, TRAINER_COLORS)
     st.divider()
 
-    month_events = df[
-        (pd.to_datetime(df["Date"]).dt.month==selected_month) &
-        (pd.to_datetime(df["Date"]).dt.year==selected_year)
-    ].copy()
+    month_events = load_month_events(selected_year, selected_month)
 
     calendar_grid(month_events, selected_year, selected_month, TRAINERS, TRAINER_COLORS, role_prefix="viewer")
     st.divider()
-    day_details_panel(month_events, df, can_unmark=False, close_key="viewer_close_day")
+    day_details_panel(month_events, user_email, can_unmark=False, close_key="viewer_close_day")
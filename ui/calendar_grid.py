@@ -1,10 +1,11 @@
 import streamlit as st, calendar
 from datetime import datetime
-from core.utils import get_events_for_day
+from core.utils import get_events_for_day, index_by_day
 from core.rules import render_mixed_calendar_cell
 
 def calendar_grid(month_events, selected_year, selected_month, TRAINERS, TRAINER_COLORS, role_prefix="admin"):
     cal = calendar.monthcalendar(selected_year, selected_month)
+    day_index = index_by_day(month_events)
     days_of_week = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
 
     header_cols = st.columns(7)
@@ -22,7 +23,7 @@ def calendar_grid(month_events, selected_year, selected_month, TRAINERS, TRAINER
                                 unsafe_allow_html=True)
                 else:
                     day_date = datetime(selected_year, selected_month, day).date()
-                    day_events = get_events_for_day(month_events, day_date)
+                    day_events = get_events_for_day(month_events, day_date, day_index)
 
                     rendered = render_mixed_calendar_cell(day, day_events, TRAINERS, TRAINER_COLORS)
                     if not rendered:
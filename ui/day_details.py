@@ -1,10 +1,10 @@
 import streamlit as st
 from core.utils import get_events_for_day
-from core.storage import save_events
+from core.storage import delete_events, ConflictError
 
-def day_details_panel(month_events, df, can_unmark=False, close_key="close_day"):
+def day_details_panel(month_events, user_email, can_unmark=False, close_key="close_day"):
     if "selected_day" not in st.session_state or not st.session_state["selected_day"]:
-        return df
+        return
 
     sel_day = st.session_state["selected_day"]
     st.subheader(f"📌 Events on {sel_day.strftime('%A, %d %B %Y')}")
@@ -13,8 +13,8 @@ def day_details_panel(month_events, df, can_unmark=False, close_key="close_day")
     if len(day_all) == 0:
         st.info("No events on this day.")
     else:
-        blocked_today = day_all[day_all.get("Is Marked", False) == True]
-        normal_today  = day_all[day_all.get("Is Marked", False) != True]
+        blocked_today = day_all[day_all["Is Marked"]]
+        normal_today  = day_all[~day_all["Is Marked"]]
 
         if len(blocked_today):
             for idx, ev in blocked_today.iterrows():
@@ -27,11 +27,14 @@ def day_details_panel(month_events, df, can_unmark=False, close_key="close_day")
                     st.write(f"**Marked by:** {ev.get('Modified By','N/A')}")
                     st.write(f"**Modified:** {ev.get('Date Modified','')}")
                     if can_unmark and st.button("✅ Unmark this date", key=f"unmark_day_{idx}"):
-                        df = df.drop(idx).reset_index(drop=True)
-                        save_events(df)
-                        st.success("✅ Date unmarked!")
-                        st.session_state["selected_day"] = None
-                        st.rerun()
+                        try:
+                            delete_events([idx], expected_version=month_events.attrs.get("version"), user=user_email)
+                        except ConflictError as e:
+                            st.error(f"❌ {e}")
+                        else:
+                            st.success("✅ Date unmarked!")
+                            st.session_state["selected_day"] = None
+                            st.rerun()
 
         if len(normal_today):
             for _, ev in normal_today.iterrows():
@@ -51,5 +54,3 @@ def day_details_panel(month_events, df, can_unmark=False, close_key="close_day")
     if st.button("❌ Close Day Details", key=close_key):
         st.session_state["selected_day"] = None
         st.rerun()
-
-    return df
@@ -2,9 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 from io import BytesIO
-from core.utils import generate_title, trainer_matches
-from core.rules import is_date_blocked_for_trainer
-from core.storage import save_events, append_audit
+from core.utils import generate_title
+from core.storage import insert_events, update_events, delete_events, apply_event_changes, append_audit, ConflictError, DERIVED_EVENT_COLUMNS, recent_changes, undo_change, block_index, select_events, search_events, SEARCH_COLUMNS
 
 def clear_event_selections():
     """Clear all event checkbox selections from session state."""
@@ -22,7 +21,7 @@ def show_event_saved_dialog(event_count):
             del st.session_state["event_saved_count"]
         st.rerun()
 
-def new_event_tab(df, user_email, TRAINERS, TYPES, STATUSES, SOURCES, MEDIUMS, LOCATIONS,
+def new_event_tab(user_email, TRAINERS, TYPES, STATUSES, SOURCES, MEDIUMS, LOCATIONS,
                   DEFAULT_TYPE, DEFAULT_STATUS, DEFAULT_SOURCE, DEFAULT_MEDIUM, DEFAULT_LOCATION):
     st.header("Add New Event")
 
@@ -56,29 +55,26 @@ def new_event_tab(df, user_email, TRAINERS, TYPES, STATUSES, SOURCES, MEDIUMS, L
         if submitted:
             if not client or not client.strip():
                 st.error("❌ Client is required!")
-                return df
+                return
             if not course or not course.strip():
                 st.error("❌ Course / Description is required!")
-                return df
+                return
             if not trainer:
                 st.error("❌ Please select at least one trainer!")
-                return df
+                return
             if end_date < start_date:
                 st.error("❌ End Date cannot be before Start Date!")
-                return df
+                return
 
             trainers_for_event = TRAINERS if "All" in trainer else trainer
-            blocked_dates = []
-            cur = start_date
-            while cur <= end_date:
-                for t in trainers_for_event:
-                    if is_date_blocked_for_trainer(df, cur, t):
-                        blocked_dates.append(f"{cur} ({t})")
-                cur += timedelta(days=1)
+            blocked_dates = [
+                f"{day.date()} ({t})"
+                for day, t in block_index().blocked(trainers_for_event, start_date, end_date)
+            ]
 
             if blocked_dates:
                 st.error("❌ Cannot create event! Blocked for: " + ", ".join(sorted(set(blocked_dates))))
-                return df
+                return
 
             trainer_list = ", ".join(TRAINERS) if "All" in trainer else ", ".join(trainer)
             events_to_add = []
@@ -107,14 +103,12 @@ def new_event_tab(df, user_email, TRAINERS, TYPES, STATUSES, SOURCES, MEDIUMS, L
                 events_to_add.append(row)
                 cur += timedelta(days=1)
 
-            df = pd.concat([df, pd.DataFrame(events_to_add)], ignore_index=True)
-            save_events(df)
+            insert_events(events_to_add)
             append_audit(user_email, "Created Event", f"{len(events_to_add)} event(s) added")
             # Set session state for confirmation popup after rerun
             st.session_state["event_saved_success"] = True
             st.session_state["event_saved_count"] = len(events_to_add)
             st.rerun()
-    return df
 
 def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, MEDIUMS, TYPES, RULE_BLOCK_PREVENT_DUPLICATES):
     st.header("Manage Events")
@@ -131,47 +125,74 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
     status_filter = col3.selectbox("Status", STATUSES, key="search_status")
     source_filter = col4.selectbox("Source", SOURCES, key="search_source")
     client_search = col5.text_input("Client", key="search_client")
+    search_all = col5.checkbox("All text fields", key="search_all_fields",
+                               help="Also search Course/Description and Notes")
 
-    result = df.copy()
+    dates = {}
     if use_date_range:
         if date_to < date_from:
             st.warning("⚠️ 'To Date' cannot be before 'From Date'")
         else:
-            result = result[
-                (pd.to_datetime(result["Date"]).dt.date >= date_from) &
-                (pd.to_datetime(result["Date"]).dt.date <= date_to)
-            ]
-
-    if trainer_filter != "All":
-        result = result[trainer_matches(result["Trainer Calendar"], trainer_filter)]
-    if status_filter != "All":
-        result = result[result["Status"] == status_filter]
-    if source_filter != "All":
-        result = result[result["Source"] == source_filter]
-    if client_search:
-        result = result[result["Client"].str.contains(client_search, case=False, na=False)]
+            dates = {"date_from": date_from, "date_to": date_to}
+
+    # Filters resolve on bitmaps; only the matching rows are copied out
+    result = select_events(df, trainer=trainer_filter, Status=status_filter, Source=source_filter,
+                           include_archived=bool(dates), **dates)
+    result = search_events(result, client_search, SEARCH_COLUMNS if search_all else ["Client"])
+    live = result.index.isin(df.index)
+    archived, result = result[~live], result[live]
+
+    # Archived events can be looked at and downloaded, not edited
+    if archived is not None and len(archived):
+        with st.expander(f"🗄️ {len(archived)} archived event(s) in this range (read-only)"):
+            display_archived = archived.drop(columns=DERIVED_EVENT_COLUMNS)
+            display_archived.index = range(1, len(display_archived) + 1)
+            st.dataframe(display_archived, use_container_width=True)
+
+    # Undo one earlier save (e.g. a mistaken bulk delete) without touching
+    # anything saved after it
+    changes = recent_changes(limit=10)
+    if changes:
+        with st.expander("🕘 Recent Changes"):
+            for change in changes:
+                summary = ", ".join(
+                    f"{change[kind]} {label}" for kind, label in
+                    (("inserts", "added"), ("updates", "edited"), ("deletes", "deleted")) if change[kind]
+                )
+                cA, cB = st.columns([0.8, 0.2])
+                cA.write(f"{change['ts'].replace('T', ' ')} - {change['user'] or 'unknown'}: {summary}")
+                if cB.button("↩️ Undo", key=f"undo_{change['version']}"):
+                    try:
+                        undo_change(change["version"], user_email)
+                    except (ConflictError, ValueError) as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        st.success("✅ Change undone!")
+                        st.rerun()
 
     st.write(f"**Showing {len(result)} events**")
     if len(result) == 0:
         st.info("No events found.")
         return df
 
+    # Rows are labelled by Event ID, so a checkbox keeps pointing at the same
+    # event when other rows are added or deleted
     selected_events = []
-    for idx in result.index:
+    for event_id in result.index:
         cA, cB = st.columns([0.1, 0.9])
         with cA:
-            if st.checkbox("", key=f"check_{idx}"):
-                selected_events.append(idx)
+            if st.checkbox("", key=f"check_{event_id}"):
+                selected_events.append(event_id)
         with cB:
-            st.write(f"**{result.loc[idx,'Title']}** - {result.loc[idx,'Date'].strftime('%Y-%m-%d')}")
+            st.write(f"**{result.loc[event_id,'Title']}** - {result.loc[event_id,'Date'].strftime('%Y-%m-%d')}")
 
     st.divider()
-    display_result = result.copy()
+    display_result = result.drop(columns=DERIVED_EVENT_COLUMNS)
     display_result.index = range(1, len(display_result) + 1)
     st.dataframe(display_result, use_container_width=True)
 
     towrite = BytesIO()
-    result.to_excel(towrite, index=False, engine="openpyxl")
+    display_result.to_excel(towrite, index=False, engine="openpyxl")
     towrite.seek(0)
     st.download_button("⬇️ Download Filtered Data", data=towrite,
                        file_name="Filtered_Events.xlsx",
@@ -194,8 +215,8 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
             with st.form("single_edit_form"):
                 c1, c2, c3 = st.columns(3)
                 with c1:
-                    edit_start_date = st.date_input("Start Date", value=pd.to_datetime(selected_event["Date"]).date())
-                    edit_end_date = st.date_input("End Date", value=pd.to_datetime(selected_event["Date"]).date())
+                    edit_start_date = st.date_input("Start Date", value=selected_event["Date"].date())
+                    edit_end_date = st.date_input("End Date", value=selected_event["Date"].date())
                 with c2:
                     edit_type = st.selectbox("Type", TYPES, index=TYPES.index(selected_event["Type"]) if selected_event["Type"] in TYPES else 0)
                     edit_status = st.selectbox("Status", STATUSES[1:], index=STATUSES[1:].index(selected_event["Status"]) if selected_event["Status"] in STATUSES[1:] else 0)
@@ -226,7 +247,6 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                         st.error("❌ End date cannot be before start.")
                         return df
 
-                    df_drop = df.drop(selected_idx).reset_index(drop=True)
                     trainer_list = ", ".join(TRAINERS) if "All" in edit_trainer else ", ".join(edit_trainer)
 
                     events_to_add = []
@@ -255,8 +275,17 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                         events_to_add.append(row)
                         cur += timedelta(days=1)
 
-                    df = pd.concat([df_drop, pd.DataFrame(events_to_add)], ignore_index=True)
-                    save_events(df)
+                    try:
+                        if len(events_to_add) == 1:
+                            # Still one day: edit in place so the event keeps its Event ID
+                            update_events({selected_idx: events_to_add[0]},
+                                          expected_version=df.attrs.get("version"), user=user_email)
+                        else:
+                            apply_event_changes(inserts=events_to_add, deletes=[selected_idx],
+                                                expected_version=df.attrs.get("version"), user=user_email)
+                    except ConflictError as e:
+                        st.error(f"❌ {e}")
+                        return df
                     append_audit(user_email, "Edited Event", f"{len(events_to_add)} day(s)")
                     st.success("✅ Updated!")
                     clear_event_selections()
@@ -276,8 +305,7 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                         original["Is Marked"] = False
                         original["Marked For"] = ""
                         original["Title"] = generate_title(original)
-                        df = pd.concat([df, pd.DataFrame([original])], ignore_index=True)
-                        save_events(df)
+                        insert_events([original])
                         st.success("✅ Duplicated!")
                         clear_event_selections()
                         st.rerun()
@@ -293,12 +321,12 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                             return df
                         original = df.loc[selected_idx].copy()
                         trainers_for_event = [t.strip() for t in str(original["Trainer Calendar"]).split(",")]
+                        blocked_days = {day.date() for day, _ in block_index().blocked(trainers_for_event, rs, re_)}
                         new_events=[]
                         cur=rs
                         while cur<=re_:
                             if RULE_BLOCK_PREVENT_DUPLICATES:
-                                any_block = any(is_date_blocked_for_trainer(df, cur, t) for t in trainers_for_event)
-                                if any_block:
+                                if cur in blocked_days:
                                     cur += timedelta(days=1); continue
                             e=original.copy()
                             e["Date"]=pd.Timestamp(cur)
@@ -310,8 +338,7 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                             e["Title"]=generate_title(e)
                             new_events.append(e)
                             cur += timedelta(days=1)
-                        df = pd.concat([df, pd.DataFrame(new_events)], ignore_index=True)
-                        save_events(df)
+                        insert_events(new_events)
                         st.success(f"✅ {len(new_events)} duplicates created!")
                         clear_event_selections()
                         st.rerun()
@@ -319,8 +346,11 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
         with op_tab3:
             st.warning("⚠️ Delete selected event")
             if st.button("🗑️ Delete", type="primary", use_container_width=True):
-                df = df.drop([selected_idx]).reset_index(drop=True)
-                save_events(df)
+                try:
+                    delete_events([selected_idx], expected_version=df.attrs.get("version"), user=user_email)
+                except ConflictError as e:
+                    st.error(f"❌ {e}")
+                    return df
                 st.success("✅ Deleted!")
                 clear_event_selections()
                 st.rerun()
@@ -359,18 +389,28 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                     if not fields:
                         st.warning("Pick at least one field.")
                         return df
+                    changes_by_id = {}
                     for idx in selected_events:
+                        changes = {}
                         for f,v in updates.items():
                             if f=="Trainer Calendar" and v=="All":
-                                df.at[idx,f] = ", ".join(TRAINERS)
+                                changes[f] = ", ".join(TRAINERS)
                             else:
-                                df.at[idx,f] = v
-                        df.at[idx,"Date Modified"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                        df.at[idx,"Action Type"] = "Bulk Modified"
-                        df.at[idx,"Modified By"] = user_email
-                        df.at[idx,"Title"] = generate_title(df.loc[idx])
-
-                    save_events(df)
+                                changes[f] = v
+                        changes["Date Modified"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+                        changes["Action Type"] = "Bulk Modified"
+                        changes["Modified By"] = user_email
+                        row = df.loc[idx].copy()
+                        for f,v in changes.items():
+                            row[f] = v
+                        changes["Title"] = generate_title(row)
+                        changes_by_id[idx] = changes
+
+                    try:
+                        update_events(changes_by_id, expected_version=df.attrs.get("version"), user=user_email)
+                    except ConflictError as e:
+                        st.error(f"❌ {e}")
+                        return df
                     st.success("✅ Bulk updated!")
                     clear_event_selections()
                     st.rerun()
@@ -392,8 +432,7 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                             original["Marked For"]=""
                             original["Title"]=generate_title(original)
                             new_events.append(original)
-                        df=pd.concat([df,pd.DataFrame(new_events)],ignore_index=True)
-                        save_events(df)
+                        insert_events(new_events)
                         st.success(f"✅ {len(new_events)} duplicated!")
                         clear_event_selections()
                         st.rerun()
@@ -407,14 +446,15 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                         if re_ < rs:
                             st.error("End after start"); return df
                         new_events=[]
+                        blocks = block_index()
                         for idx in selected_events:
                             original=df.loc[idx].copy()
                             trainers_for_event = [t.strip() for t in str(original["Trainer Calendar"]).split(",")]
+                            blocked_days = {day.date() for day, _ in blocks.blocked(trainers_for_event, rs, re_)}
                             cur=rs
                             while cur<=re_:
                                 if RULE_BLOCK_PREVENT_DUPLICATES:
-                                    any_block = any(is_date_blocked_for_trainer(df, cur, t) for t in trainers_for_event)
-                                    if any_block:
+                                    if cur in blocked_days:
                                         cur += timedelta(days=1); continue
                                 e=original.copy()
                                 e["Date"]=pd.Timestamp(cur)
@@ -426,8 +466,7 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
                                 e["Title"]=generate_title(e)
                                 new_events.append(e)
                                 cur += timedelta(days=1)
-                        df=pd.concat([df,pd.DataFrame(new_events)],ignore_index=True)
-                        save_events(df)
+                        insert_events(new_events)
                         st.success(f"✅ {len(new_events)} duplicates created!")
                         clear_event_selections()
                         st.rerun()
@@ -435,8 +474,11 @@ def manage_events_tab(df, user_email, TRAINERS, STATUSES, SOURCES, LOCATIONS, ME
         with op_tab3:
             st.warning(f"⚠️ Delete {len(selected_events)} selected events")
             if st.button("🗑️ Bulk Delete", type="primary", use_container_width=True):
-                df = df.drop(selected_events).reset_index(drop=True)
-                save_events(df)
+                try:
+                    delete_events(selected_events, expected_version=df.attrs.get("version"), user=user_email)
+                except ConflictError as e:
+                    st.error(f"❌ {e}")
+                    return df
                 st.success("✅ Deleted!")
                 clear_event_selections()
                 st.rerun()
@@ -467,34 +509,33 @@ def trainer_events_list_tab(df, trainer_name, STATUSES, SOURCES):
 
     with col4:
         client_search = st.text_input("Client Search", key="trainer_client_search")
+        search_all = st.checkbox("All text fields", key="trainer_search_all_fields",
+                                 help="Also search Course/Description and Notes")
 
     # Filter the trainer's events
-    from core.utils import trainer_matches, marked_for_includes
-
-    # Get only this trainer's events
-    trainer_events = df[trainer_matches(df["Trainer Calendar"], trainer_name)]
-    marked_events = df[
-        (df["Is Marked"] == True) &
-        (df["Marked For"].apply(lambda x: marked_for_includes(x, trainer_name)))
-    ]
-    result = pd.concat([trainer_events, marked_events], ignore_index=True).drop_duplicates()
+    from core.utils import marked_for_includes
 
-    # Apply filters
+    # A date range can reach into archived years
+    dates = {}
     if use_date_range:
         if date_to < date_from:
             st.warning("⚠️ 'To Date' cannot be before 'From Date'")
         else:
-            result = result[
-                (pd.to_datetime(result["Date"]).dt.date >= date_from) &
-                (pd.to_datetime(result["Date"]).dt.date <= date_to)
-            ]
+            dates = {"date_from": date_from, "date_to": date_to}
+    filters = dict(Status=status_filter, Source=source_filter, include_archived=bool(dates), **dates)
+
+    # Get only this trainer's events
+    trainer_events = select_events(df, trainer=trainer_name, **filters)
+    marked_events = select_events(df, **{"Is Marked": True}, **filters)
+    marked_events = marked_events[
+        marked_events["Marked For"].apply(lambda x: marked_for_includes(x, trainer_name)).astype(bool)
+    ]
+    # Keep the Event IDs: the text search looks rows up by them
+    result = pd.concat([trainer_events, marked_events])
+    result = result[~result.index.duplicated()]
 
-    if status_filter != "All":
-        result = result[result["Status"] == status_filter]
-    if source_filter != "All":
-        result = result[result["Source"] == source_filter]
-    if client_search:
-        result = result[result["Client"].str.contains(client_search, case=False, na=False)]
+    # Apply filters
+    result = search_events(result, client_search, SEARCH_COLUMNS if search_all else ["Client"])
 
     # Sort by date
     result = result.sort_values("Date", ascending=True)
@@ -509,9 +550,9 @@ def trainer_events_list_tab(df, trainer_name, STATUSES, SOURCES):
     # Summary statistics
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Events", len(result[result["Is Marked"] != True]))
+        st.metric("Total Events", len(result[~result["Is Marked"]]))
     with col2:
-        st.metric("Blocked Dates", len(result[result["Is Marked"] == True]))
+        st.metric("Blocked Dates", len(result[result["Is Marked"]]))
     with col3:
         if len(result) > 0:
             date_range = f"{result['Date'].min().strftime('%Y-%m-%d')} to {result['Date'].max().strftime('%Y-%m-%d')}"
@@ -522,14 +563,14 @@ def trainer_events_list_tab(df, trainer_name, STATUSES, SOURCES):
     # Display events in expandable cards
     st.subheader("📅 Event Details")
 
-    normal_events = result[result["Is Marked"] != True]
-    blocked_events = result[result["Is Marked"] == True]
+    normal_events = result[~result["Is Marked"]]
+    blocked_events = result[result["Is Marked"]]
 
     # Show blocked dates first
     if len(blocked_events) > 0:
         st.markdown("#### 🚫 Blocked Dates")
         for _, ev in blocked_events.iterrows():
-            date_str = pd.to_datetime(ev["Date"]).strftime("%a, %d %b %Y")
+            date_str = ev["Date"].strftime("%a, %d %b %Y")
             with st.expander(f"🚫 {date_str} - BLOCKED"):
                 st.error("This date is blocked for you.")
                 st.write(f"**Reason:** {ev.get('Course/Description', 'No reason provided')}")
@@ -539,7 +580,7 @@ def trainer_events_list_tab(df, trainer_name, STATUSES, SOURCES):
     if len(normal_events) > 0:
         st.markdown("#### 📅 Scheduled Events")
         for _, ev in normal_events.iterrows():
-            date_str = pd.to_datetime(ev["Date"]).strftime("%a, %d %b %Y")
+            date_str = ev["Date"].strftime("%a, %d %b %Y")
             title = ev.get("Title", "Untitled Event")
             with st.expander(f"📅 {date_str} - {title}"):
                 col1, col2 = st.columns(2)
@@ -565,7 +606,7 @@ def trainer_events_list_tab(df, trainer_name, STATUSES, SOURCES):
     display_columns = ["Date", "Title", "Type", "Status", "Source", "Client",
                        "Course/Description", "Medium", "Location"]
     display_df = result[[c for c in display_columns if c in result.columns]].copy()
-    display_df["Date"] = pd.to_datetime(display_df["Date"]).dt.strftime("%Y-%m-%d")
+    display_df["Date"] = display_df["Date"].dt.strftime("%Y-%m-%d")
     display_df.index = range(1, len(display_df) + 1)
 
     st.dataframe(display_df, use_container_width=True)
@@ -618,28 +659,22 @@ def viewer_events_list_tab(df, TRAINERS, STATUSES, SOURCES):
 
     with col5:
         client_search = st.text_input("Client Search", key="viewer_client_search")
+        search_all = st.checkbox("All text fields", key="viewer_search_all_fields",
+                                 help="Also search Course/Description and Notes")
 
-    # Start with all events (excluding marked/blocked)
-    result = df.copy()
-
-    # Apply filters
+    # Apply filters; a date range includes archived events in the range
+    dates = {}
     if use_date_range:
         if date_to < date_from:
             st.warning("⚠️ 'To Date' cannot be before 'From Date'")
         else:
-            result = result[
-                (pd.to_datetime(result["Date"]).dt.date >= date_from) &
-                (pd.to_datetime(result["Date"]).dt.date <= date_to)
-            ]
+            dates = {"date_from": date_from, "date_to": date_to}
 
-    if trainer_filter != "All":
-        result = result[trainer_matches(result["Trainer Calendar"], trainer_filter)]
-    if status_filter != "All":
-        result = result[result["Status"] == status_filter]
-    if source_filter != "All":
-        result = result[result["Source"] == source_filter]
-    if client_search:
-        result = result[result["Client"].str.contains(client_search, case=False, na=False)]
+    result = select_events(
+        df, trainer=trainer_filter, Status=status_filter, Source=source_filter,
+        include_archived=bool(dates), **dates,
+    )
+    result = search_events(result, client_search, SEARCH_COLUMNS if search_all else ["Client"])
 
     # Sort by date
     result = result.sort_values("Date", ascending=True)
@@ -654,10 +689,10 @@ def viewer_events_list_tab(df, TRAINERS, STATUSES, SOURCES):
     # Summary statistics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        normal_count = len(result[result["Is Marked"] != True])
+        normal_count = len(result[~result["Is Marked"]])
         st.metric("Total Events", normal_count)
     with col2:
-        blocked_count = len(result[result["Is Marked"] == True])
+        blocked_count = len(result[result["Is Marked"]])
         st.metric("Blocked Dates", blocked_count)
     with col3:
         unique_trainers = set()
@@ -677,14 +712,14 @@ def viewer_events_list_tab(df, TRAINERS, STATUSES, SOURCES):
     # Display events in expandable cards
     st.subheader("📅 Event Details")
 
-    normal_events = result[result["Is Marked"] != True]
-    blocked_events = result[result["Is Marked"] == True]
+    normal_events = result[~result["Is Marked"]]
+    blocked_events = result[result["Is Marked"]]
 
     # Show blocked dates
     if len(blocked_events) > 0:
         st.markdown("#### 🚫 Blocked Dates")
         for _, ev in blocked_events.iterrows():
-            date_str = pd.to_datetime(ev["Date"]).strftime("%a, %d %b %Y")
+            date_str = ev["Date"].strftime("%a, %d %b %Y")
             blocked_for = ev.get('Marked For', 'All')
             with st.expander(f"🚫 {date_str} - BLOCKED ({blocked_for})"):
                 st.error(f"Blocked for: {blocked_for}")
@@ -694,7 +729,7 @@ def viewer_events_list_tab(df, TRAINERS, STATUSES, SOURCES):
     if len(normal_events) > 0:
         st.markdown("#### 📅 Scheduled Events")
         for _, ev in normal_events.iterrows():
-            date_str = pd.to_datetime(ev["Date"]).strftime("%a, %d %b %Y")
+            date_str = ev["Date"].strftime("%a, %d %b %Y")
             title = ev.get("Title", "Untitled Event")
             trainer = ev.get("Trainer Calendar", "")
             with st.expander(f"📅 {date_str} - {title}"):
@@ -722,7 +757,7 @@ def viewer_events_list_tab(df, TRAINERS, STATUSES, SOURCES):
     display_columns = ["Date", "Title", "Trainer Calendar", "Type", "Status", "Source", "Client",
                        "Course/Description", "Medium", "Location"]
     display_df = result[[c for c in display_columns if c in result.columns]].copy()
-    display_df["Date"] = pd.to_datetime(display_df["Date"]).dt.strftime("%Y-%m-%d")
+    display_df["Date"] = display_df["Date"].dt.strftime("%Y-%m-%d")
     display_df.index = range(1, len(display_df) + 1)
 
     st.dataframe(display_df, use_container_width=True)
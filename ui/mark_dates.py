@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from core.storage import save_events
+from core.storage import insert_events, delete_events, ConflictError
 from core.utils import marked_for_includes
 
 def mark_dates_tab(df, user_email, TRAINERS, RULE_ONLY_ADMIN_CAN_BLOCK, user_role):
@@ -35,8 +35,8 @@ def mark_dates_tab(df, user_email, TRAINERS, RULE_ONLY_ADMIN_CAN_BLOCK, user_rol
                     cur=mark_start
                     while cur<=mark_end:
                         existing=df[
-                            (pd.to_datetime(df["Date"]).dt.date==cur) &
-                            (df["Is Marked"]==True) &
+                            (df["Day"]==pd.Timestamp(cur)) &
+                            df["Is Marked"] &
                             (df["Marked For"].fillna("").str.strip()==marked_for_value)
                         ]
                         if len(existing)==0:
@@ -64,8 +64,7 @@ def mark_dates_tab(df, user_email, TRAINERS, RULE_ONLY_ADMIN_CAN_BLOCK, user_rol
                         cur+=timedelta(days=1)
 
                     if marked_to_add:
-                        df=pd.concat([df,pd.DataFrame(marked_to_add)],ignore_index=True)
-                        save_events(df)
+                        insert_events(marked_to_add)
                         st.success(f"✅ Marked {len(marked_to_add)} day(s) for {marked_for_value}")
                         st.rerun()
                     else:
@@ -73,17 +72,20 @@ def mark_dates_tab(df, user_email, TRAINERS, RULE_ONLY_ADMIN_CAN_BLOCK, user_rol
 
     with col2:
         st.subheader("Currently Marked")
-        marked_dates=df[df["Is Marked"]==True].sort_values("Date")
+        marked_dates=df[df["Is Marked"]].sort_values("Date")
         if len(marked_dates):
             for idx,row in marked_dates.iterrows():
                 with st.expander(f"🚫 {row['Date'].strftime('%Y-%m-%d')} - {row['Course/Description']} (For: {row.get('Marked For')})"):
                     st.write(f"**Reason:** {row['Course/Description']}")
                     st.write(f"**Blocked For:** {row.get('Marked For')}")
                     if st.button("✅ Unmark", key=f"unmark_{idx}"):
-                        df=df.drop(idx).reset_index(drop=True)
-                        save_events(df)
-                        st.success("Unmarked!")
-                        st.rerun()
+                        try:
+                            delete_events([idx], expected_version=df.attrs.get("version"), user=user_email)
+                        except ConflictError as e:
+                            st.error(f"❌ {e}")
+                        else:
+                            st.success("Unmarked!")
+                            st.rerun()
         else:
             st.info("No blocked dates.")
 
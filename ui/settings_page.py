@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-from core.storage import read_sheet, write_sheet, create_backup, list_backups, delete_backup, restore_backup, import_backup
-from core.config import LIST_CATEGORIES
+from datetime import datetime
+from core.storage import read_sheet, write_sheet, create_backup, list_backups, count_backups, backup_file, delete_backup, restore_backup, import_backup, export_workbook, read_audit, export_audit_sheet, audit_writer, workbook_lock, archive_events, read_meta, restore_events_to, compact_journal
+from core.config import LIST_CATEGORIES, ARCHIVE_AFTER_DAYS, JOURNAL_KEEP_DAYS
 from core.security import hash_password
 
 def settings_tab(users_df, trainers_df, lists_df, rules_df, defaults_df, notif_df, EXCEL_FILE, refresh_passwords_cb, user_email=""):
@@ -218,8 +219,59 @@ def settings_tab(users_df, trainers_df, lists_df, rules_df, defaults_df, notif_d
 
         # Download current file
         st.markdown("### Download Current Data")
-        with open(EXCEL_FILE, "rb") as f:
-            st.download_button("Download Current Data File", f, file_name=EXCEL_FILE)
+        # Exporting rebuilds the whole workbook, so only do it when asked
+        if "current_export" in st.session_state:
+            prepared_at, data = st.session_state["current_export"]
+            st.download_button("Download Current Data File", data, file_name=EXCEL_FILE)
+            st.caption(f"Prepared at {prepared_at}.")
+        if st.button("Prepare Current Data File", key="prep_current_export"):
+            st.session_state["current_export"] = (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), export_workbook())
+            st.rerun()
+        lock_stats = workbook_lock.stats()
+        st.caption(
+            f"Write lock waits: {lock_stats['acquired']} "
+            f"(avg {lock_stats['avg_wait_ms']} ms, max {lock_stats['max_wait_ms']} ms, "
+            f"{lock_stats['timeouts']} timed out)"
+        )
+
+        st.divider()
+
+        # Rewind the events using the change journal
+        st.markdown("### Restore Events to a Point in Time")
+        st.info("Undoes every event change saved after the chosen time. Other settings are not affected, "
+                "and the restore can itself be undone from Manage Events.")
+        c1, c2 = st.columns(2)
+        restore_day = c1.date_input("Date", key="pit_date")
+        restore_time = c2.time_input("Time", key="pit_time")
+        if st.button("Restore Events", key="pit_restore_btn"):
+            success, message = restore_events_to(pd.Timestamp.combine(restore_day, restore_time), user_email)
+            if success:
+                st.success(f"✅ {message}")
+            else:
+                st.error(f"Failed to restore: {message}")
+        if st.button(f"Compact Journal (keep {JOURNAL_KEEP_DAYS} days)", key="compact_journal_btn"):
+            st.success(f"✅ Dropped {compact_journal()} old journal entries.")
+
+        st.divider()
+
+        # Move old events out of the workbook
+        st.markdown("### Archive Old Events")
+        st.info("Moves events dated before the chosen day into a compressed archive file. "
+                "Archived events still show up in date-range searches but can no longer be edited.")
+        archived_before = read_meta(cached=True).get("archived_before")
+        if archived_before:
+            st.caption(f"Events before {archived_before} are archived.")
+        archive_cutoff = st.date_input(
+            "Archive events dated before",
+            value=(pd.Timestamp.now() - pd.Timedelta(days=ARCHIVE_AFTER_DAYS)).date(),
+            key="archive_cutoff",
+        )
+        if st.button("Archive Events", key="archive_events_btn"):
+            success, message = archive_events(archive_cutoff, user_email)
+            if success:
+                st.success(f"✅ {message}")
+            else:
+                st.error(f"Failed to archive: {message}")
 
         st.divider()
 
@@ -242,25 +294,38 @@ def settings_tab(users_df, trainers_df, lists_df, rules_df, defaults_df, notif_d
 
         # List existing backups
         st.markdown("### Existing Backups")
-        backups = list_backups()
+        total_backups = count_backups()
 
-        if not backups:
+        if not total_backups:
             st.info("No backups found. Create your first backup using the button above.")
         else:
-            st.write(f"**{len(backups)} backup(s) available:**")
+            st.write(f"**{total_backups} backup(s) available:**")
+            page_size = 10
+            page_count = (total_backups + page_size - 1) // page_size
+            page = 1
+            if page_count > 1:
+                page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count,
+                                       value=1, step=1, key="backup_page")
+            backups = list_backups(offset=(page - 1) * page_size, limit=page_size)
             for backup in backups:
                 col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
                 with col1:
                     st.text(f"{backup['filename']}")
-                    st.caption(f"Created: {backup['created']} | Size: {backup['size_kb']} KB")
+                    st.caption(f"Created: {backup['created']} | Size: {backup['size_kb']} KB "
+                               f"({backup['added_kb']} KB new) | SHA-256: {backup['checksum'][:12]}")
                 with col2:
-                    with open(backup['filepath'], "rb") as f:
+                    # The workbook is only rebuilt once, for the backup being downloaded
+                    prepared = st.session_state.get("backup_download")
+                    if prepared and prepared[0] == backup['filename']:
                         st.download_button(
                             "Download",
-                            f,
-                            file_name=backup['filename'],
+                            prepared[1],
+                            file_name=backup['download_name'],
                             key=f"dl_{backup['filename']}"
                         )
+                    elif st.button("Prepare", key=f"prep_{backup['filename']}"):
+                        st.session_state["backup_download"] = (backup['filename'], backup_file(backup['filename']))
+                        st.rerun()
                 with col3:
                     if st.button("Restore", key=f"restore_{backup['filename']}", type="primary"):
                         success, message = restore_backup(backup['filename'], user_email)
@@ -272,6 +337,8 @@ def settings_tab(users_df, trainers_df, lists_df, rules_df, defaults_df, notif_d
                 with col4:
                     if st.button("Delete", key=f"del_{backup['filename']}", type="secondary"):
                         delete_backup(backup['filename'])
+                        if prepared and prepared[0] == backup['filename']:
+                            del st.session_state["backup_download"]
                         st.rerun()
 
     with tabs[5]:
@@ -321,5 +388,18 @@ def settings_tab(users_df, trainers_df, lists_df, rules_df, defaults_df, notif_d
 
     with tabs[7]:
         st.subheader("Audit Log")
-        audit_df = read_sheet("Audit", pd.DataFrame(columns=["Timestamp","User","Action","Details"]))
-        st.dataframe(audit_df.sort_values("Timestamp", ascending=False), use_container_width=True)
+        stats = audit_writer.stats()
+        st.caption(
+            f"Writer queue: {stats['queue_depth']} pending | {stats['entries_written']} written in "
+            f"{stats['batches_written']} batch(es) | last flush {stats['last_flush_ms']} ms, "
+            f"max {stats['max_flush_ms']} ms"
+        )
+        # Every admin rerun renders this tab, so the log is only read when
+        # shown, and without waiting for the writer (pending entries show
+        # up on a later rerun)
+        if st.checkbox("Show audit log", key="show_audit_log"):
+            audit_df = read_audit(flush=False)
+            st.dataframe(audit_df.sort_values("Timestamp", ascending=False), use_container_width=True)
+        if st.button("📤 Export to Audit Sheet"):
+            count = export_audit_sheet()
+            st.success(f"Exported {count} audit entries to the Audit sheet.")